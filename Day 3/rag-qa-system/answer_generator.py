@@ -1,15 +1,20 @@
 import os
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 from dotenv import load_dotenv
 
+from src.context import pack_context
+
 load_dotenv()
 
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+_async_client = None
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("RAG_CONTEXT_TOKEN_BUDGET", "2000"))
 
-def generate_answer(query, context_chunks):
-    context = "\n\n".join([chunk['text'] for chunk in context_chunks])
+def build_prompt(query, context_chunks, token_budget=CONTEXT_TOKEN_BUDGET):
+    context = pack_context(context_chunks, token_budget=token_budget)
 
-    prompt = f"""
+    return f"""
 You are an AI assistant that answers questions using academic text chunks provided below. 
 When answering, cite the source chunks using square brackets like [1], [2], etc., matching the numbers assigned in the context.
 
@@ -21,12 +26,44 @@ Context:
 
 Answer:"""
 
+def _stream_tokens(response):
+    for event in response:
+        if event.choices and event.choices[0].delta.content:
+            yield event.choices[0].delta.content
+
+def generate_answer(query, context_chunks, token_budget=CONTEXT_TOKEN_BUDGET, stream=False):
+    """Return the answer text, or with ``stream=True`` an iterator of answer tokens."""
+    prompt = build_prompt(query, context_chunks, token_budget=token_budget)
+
     response = client.chat.completions.create(
         model="gpt-4o-mini",  
         messages=[
             {"role": "user", "content": prompt}
         ],
         temperature=0.2,
+        max_tokens=500,
+        stream=stream
+    )
+
+    if stream:
+        return _stream_tokens(response)
+    return response.choices[0].message.content
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _async_client
+
+async def agenerate_answer(query, context_chunks, token_budget=CONTEXT_TOKEN_BUDGET):
+    prompt = build_prompt(query, context_chunks, token_budget=token_budget)
+
+    response = await get_async_client().chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.2,
         max_tokens=500
     )
 
@@ -1,7 +1,10 @@
 # app.py
 
+import html
+
 import streamlit as st
-from src.query_engine import query_rag
+from src.models import model_stats
+from src.query_engine import cache_stats, index_holder, query_rag
 
 
 st.set_page_config(page_title="RAG QA on AI Papers", layout="centered")
@@ -58,18 +61,50 @@ st.markdown("""
 st.markdown('<div class="title">🧠 AI Research Assistant</div>', unsafe_allow_html=True)
 st.markdown('<div class="subtitle">Ask questions and get answers from AI research papers</div>', unsafe_allow_html=True)
 
+# -------------------- Index Status --------------------
+with st.sidebar:
+    stats = index_holder.stats()
+    if stats["generation"]:
+        st.caption(
+            f"📚 Index: {stats['num_chunks']} chunks, {stats['size_bytes'] / 1e6:.1f} MB, "
+            f"loaded in {stats['load_seconds']:.2f}s (generation {stats['generation']})"
+        )
+    for model_name, model_info in model_stats().items():
+        st.caption(f"🧠 Model {model_name} loaded in {model_info['load_seconds']:.2f}s")
+    caches = cache_stats()
+    st.caption(
+        f"⚡ Cache hit rate: embeddings {caches['embeddings']['hit_rate']:.0%}, "
+        f"answers {caches['answers']['hit_rate']:.0%}"
+    )
+
 # -------------------- Input --------------------
 question = st.text_input("💬 Enter your question:", placeholder="e.g., What are the main components of a RAG model?")
 
 # -------------------- Action Button --------------------
 if st.button("🔍 Get Answer") and question.strip():
-    with st.spinner("🔄 Thinking... Generating your answer..."):
-        result = query_rag(question)
-
-        # -------------------- Answer Display --------------------
-        st.markdown("### 💡 Answer")
-        st.markdown(f"<div class='answer-box'>{result['answer']}</div>", unsafe_allow_html=True)
+    try:
+        with st.spinner("🔄 Thinking... Retrieving relevant sources..."):
+            result = query_rag(question, stream=True)
+    except FileNotFoundError:
+        st.error("No vector store found. Put your PDFs in data/papers/ and run `python preprocess.py` first.")
+        st.stop()
 
-        # -------------------- Source Display --------------------
+    # -------------------- Answer Display --------------------
+    st.markdown("### 💡 Answer")
+    answer_placeholder = st.empty()
+    answer_placeholder.markdown("<div class='answer-box'>✍️ Generating your answer...</div>", unsafe_allow_html=True)
 
+    # -------------------- Source Display --------------------
+    # Sources are known before the first token arrives, so show them straight away
+    st.markdown("### 📄 Sources")
+    for i, chunk in enumerate(result["sources"], start=1):
+        st.markdown(
+            f"<div class='chunk-box'><div class='chunk-source'>[{i}] {chunk['filename']}</div>"
+            f"{html.escape(chunk['text'])}</div>",
+            unsafe_allow_html=True
+        )
 
+    answer = ""
+    for token in result["answer"]:
+        answer += token
+        answer_placeholder.markdown(f"<div class='answer-box'>{answer}</div>", unsafe_allow_html=True)
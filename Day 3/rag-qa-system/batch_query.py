@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import time
+
+from src.batch import StubLLM, read_questions, run_batch
+from src.shards import store_dir_for
+from src.store import open_vector_store
+
+STORE_DIR = "vector_store"
+
+
+def main(args):
+    questions = read_questions(args.input)
+    store = open_vector_store(store_dir_for(args.store_dir, args.shard))
+
+    if args.llm == "stub":
+        generate = StubLLM(latency=args.stub_latency)
+    else:
+        from answer_generator import agenerate_answer
+        generate = agenerate_answer
+
+    start = time.perf_counter()
+    counts = asyncio.run(run_batch(
+        questions, store, args.output, generate,
+        top_k=args.top_k, concurrency=args.concurrency, rate_limit=args.rate_limit,
+        timeout=args.timeout, block_size=args.block_size,
+    ))
+    elapsed = time.perf_counter() - start
+
+    processed = counts["answered"] + counts["failed"]
+    print(f"Answered {counts['answered']}, failed {counts['failed']}, skipped {counts['skipped']} "
+          f"(already done) in {elapsed:.1f}s ({processed / max(elapsed, 1e-9):.1f} questions/sec).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer a JSONL file of questions concurrently.")
+    parser.add_argument("input", help='JSONL with one {"id": ..., "question": ...} per line ("id" optional).')
+    parser.add_argument("output", help="JSONL results file; re-running resumes where it stopped.")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--shard", help="Use this shard of a sharded store (vector_store/shards/<name>).")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum generation calls in flight.")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Maximum generation calls started per second.")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Seconds before one generation call is abandoned.")
+    parser.add_argument("--block-size", type=int, default=256, help="Questions retrieved per batched search.")
+    parser.add_argument("--llm", choices=["openai", "stub"], default="openai")
+    parser.add_argument("--stub-latency", type=float, default=0.2, help="Simulated seconds per stub answer.")
+    main(parser.parse_args())
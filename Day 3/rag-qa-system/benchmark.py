@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from src.batch import StubLLM
+from src.models import model_stats
+from src.retriever import encode_query, reciprocal_rank_fusion
+from src.shards import store_dir_for
+from src.store import open_vector_store
+
+STORE_DIR = "vector_store"
+QUERIES_FILE = "benchmarks/queries.jsonl"
+
+
+def read_labelled_queries(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def percentiles(samples):
+    samples_ms = np.asarray(samples) * 1000
+    return {
+        "n": len(samples_ms),
+        "mean_ms": float(samples_ms.mean()),
+        "p50_ms": float(np.percentile(samples_ms, 50)),
+        "p95_ms": float(np.percentile(samples_ms, 95)),
+        "p99_ms": float(np.percentile(samples_ms, 99)),
+    }
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def is_relevant(chunk, label):
+    return chunk["filename"] == label["filename"] and label["contains"].lower() in chunk["text"].lower()
+
+
+def recall_at_k(results, labels):
+    """Fraction of labelled facts found in the top-k chunks."""
+    return sum(any(is_relevant(chunk, label) for chunk in results) for label in labels) / len(labels)
+
+
+async def time_generation(generate, items):
+    samples = []
+    for question, sources in items:
+        start = time.perf_counter()
+        await generate(question, sources)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def run(store_dir=STORE_DIR, queries_path=QUERIES_FILE, top_k=5, candidates=20, repeats=3, load_repeats=5,
+        llm="stub", stub_latency=0.05):
+    queries = read_labelled_queries(queries_path)
+    timings = {"index_load": [], "query_encode": [], "faiss_search": [], "sparse_search": [], "generation": []}
+
+    for _ in range(load_repeats):
+        start = time.perf_counter()
+        store = open_vector_store(store_dir)
+        timings["index_load"].append(time.perf_counter() - start)
+
+    if llm == "stub":
+        generate = StubLLM(latency=stub_latency)
+    elif llm == "openai":
+        from answer_generator import agenerate_answer
+        generate = agenerate_answer
+    else:
+        generate = None
+
+    # Load the model up front: its cold start is reported separately and must not skew the percentiles
+    encode_query("warm up")
+
+    recalls = []
+    to_generate = []
+    depth = max(top_k, candidates) if store.sparse is not None else top_k
+    for repeat in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            query_embedding = encode_query(query["question"])
+            timings["query_encode"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            _, indices = store.index.search(query_embedding, depth)
+            timings["faiss_search"].append(time.perf_counter() - start)
+            rankings = [[int(i) for i in indices[0] if i != -1]]
+
+            if store.sparse is not None:
+                start = time.perf_counter()
+                sparse_ids, _ = store.sparse.search(query["question"], depth)
+                timings["sparse_search"].append(time.perf_counter() - start)
+                rankings.append([int(i) for i in sparse_ids])
+
+            results = [dict(store.chunks[i], score=score) for i, score in reciprocal_rank_fusion(rankings)[:top_k]]
+            if repeat == 0:
+                recalls.append(recall_at_k(results, query["relevant"]))
+                to_generate.append((query["question"], results))
+
+    if generate is not None:
+        # One event loop for the whole pass: the async OpenAI client's connections belong to the loop it first ran on
+        timings["generation"] = asyncio.run(time_generation(generate, to_generate))
+
+    return {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {
+            "top_k": top_k,
+            "candidates": candidates,
+            "llm": llm,
+            "num_queries": len(queries),
+            "num_chunks": len(store.chunks),
+            "generation": store.generation,
+            "dtype": store.meta["dtype"],
+            "index": store.index_config,
+        },
+        "timings": {name: percentiles(samples) for name, samples in timings.items() if samples},
+        f"recall@{top_k}": float(np.mean(recalls)),
+        "models": model_stats(),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(report, baseline, tolerance=0.10):
+    """Print metrics that regressed by more than ``tolerance`` relative to ``baseline``."""
+    regressions = []
+    for name, stats in report["timings"].items():
+        old = baseline.get("timings", {}).get(name)
+        if old and stats["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name} p95 {old['p95_ms']:.2f} -> {stats['p95_ms']:.2f} ms")
+    recall_key = f"recall@{report['config']['top_k']}"
+    if recall_key in baseline and report[recall_key] < baseline[recall_key] - 1e-9:
+        regressions.append(f"{recall_key} {baseline[recall_key]:.3f} -> {report[recall_key]:.3f}")
+    if baseline.get("peak_rss_mb") and report["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(f"peak RSS {baseline['peak_rss_mb']:.0f} -> {report['peak_rss_mb']:.0f} MB")
+    for line in regressions:
+        print(f"REGRESSION: {line}", file=sys.stderr)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark retrieval and generation latency, recall and memory.")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--shard", help="Use this shard of a sharded store (vector_store/shards/<name>).")
+    parser.add_argument("--queries", default=QUERIES_FILE, help="Labelled JSONL query set.")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3, help="Passes over the query set for retrieval timings.")
+    parser.add_argument("--load-repeats", type=int, default=5)
+    parser.add_argument("--llm", choices=["stub", "openai", "none"], default="stub")
+    parser.add_argument("--stub-latency", type=float, default=0.05)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--baseline", help="Previous JSON report; exit non-zero on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative slowdown vs. the baseline.")
+    args = parser.parse_args()
+
+    report = run(store_dir_for(args.store_dir, args.shard), args.queries, args.top_k, args.candidates, args.repeats, args.load_repeats,
+                 args.llm, args.stub_latency)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            if compare(report, json.load(f), args.tolerance):
+                sys.exit(1)
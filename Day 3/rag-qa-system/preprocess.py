@@ -1,19 +1,187 @@
-from src.loader import load_pdfs_from_directory
-from src.chunker import chunk_documents
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from itertools import islice
+
+import numpy as np
+
+from src.loader import iter_pdf_pages
+from src.chunker import stream_chunks
 from src.vectorizer import embed_chunks
+from src.ann import DEFAULT_INDEX_CONFIG, INDEX_TYPES
 from src.retriever import build_faiss_index
-import os
+from src.shards import SHARDS_DIR, shard_for
+from src.sparse import BM25Index
+from src.store import dequantize, open_vector_store, read_meta, save_vector_store
+
+PAPERS_DIR = "data/papers"
+STORE_DIR = "vector_store"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_sha256(path, block_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"params": None, "files": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def embed_stream(chunks, batch_size=64, dtype="float32", block_size=None):
+    """Embed a chunk stream block by block as it is produced; returns (chunk list, embedding matrix or None).
+
+    Embedding starts as soon as the first ``block_size`` chunks exist, so it overlaps
+    with extraction and chunking. The chunk records themselves are still kept, since
+    the store, the FAISS index and BM25 are all written from the complete set.
+    """
+    block_size = block_size or batch_size * 16
+    chunks = iter(chunks)
+    all_chunks, blocks = [], []
+    while True:
+        block = list(islice(chunks, block_size))
+        if not block:
+            break
+        all_chunks.extend(block)
+        blocks.append(embed_chunks(block, batch_size=batch_size, dtype=dtype))
+    return all_chunks, np.concatenate(blocks) if blocks else None
 
-if __name__ == "__main__":
-    docs = load_pdfs_from_directory("data/papers")
-    print(f"Loaded {len(docs)} documents.")
 
-    chunks = chunk_documents(docs)
-    print(f"Chunked into {len(chunks)} segments.")
+def ingest(papers_dir=PAPERS_DIR, store_dir=STORE_DIR, chunk_size=1000, chunk_overlap=200, full=False,
+           workers=None, dtype="float32", batch_size=64, index_type=None, include=None):
+    """Bring the store in ``store_dir`` up to date with the PDFs in ``papers_dir``.
+
+    ``include`` optionally restricts the store to a subset of filenames; files
+    outside it are treated as absent (used for hash-partitioned shards).
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+
+    params = {"chunker": "stream", "chunk_size": chunk_size, "chunk_overlap": chunk_overlap, "dtype": dtype}
+    manifest = load_manifest(manifest_path)
+
+    # Changed chunking or storage parameters invalidate every stored chunk
+    previous_meta = read_meta(store_dir)
+    if full or manifest["params"] != params or previous_meta is None:
+        manifest = {"params": params, "files": {}}
+        store = None
+    else:
+        store = open_vector_store(store_dir)
+
+    # Keep the previously chosen (possibly tuned) index configuration unless overridden
+    previous_config = (previous_meta or {}).get("index", DEFAULT_INDEX_CONFIG)
+    index_config = previous_config
+    if index_type is not None and index_type != previous_config["type"]:
+        index_config = {"type": index_type, "build": {}, "search": {}}
+
+    current = {
+        filename: file_sha256(os.path.join(papers_dir, filename))
+        for filename in sorted(os.listdir(papers_dir))
+        if filename.endswith(".pdf") and (include is None or filename in include)
+    }
+    changed = [name for name, digest in current.items() if manifest["files"].get(name) != digest]
+    deleted = [name for name in manifest["files"] if name not in current]
+
+    if not changed and not deleted and index_config == previous_config:
+        print(f"Vector store is up to date ({len(current)} documents).")
+        return
+
+    print(f"{len(changed)} new or changed, {len(deleted)} deleted, "
+          f"{len(current) - len(changed)} unchanged documents.")
+
+    stale = set(changed) | set(deleted)
+    kept_chunks, kept_embeddings = [], None
+    if store is not None:
+        keep = [i for i, chunk in enumerate(store.chunks) if chunk["filename"] not in stale]
+        kept_chunks = [store.chunks[i] for i in keep]
+        kept_embeddings = np.asarray(store.embeddings[keep])
+
+    new_chunks, new_embeddings = [], None
+    if changed:
+        # Pages stream out of the extraction pool, so chunking overlaps extraction
+        pages = iter_pdf_pages([os.path.join(papers_dir, name) for name in changed], workers=workers)
+        chunk_stream = stream_chunks(pages, chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+        start = time.perf_counter()
+        new_chunks, new_embeddings = embed_stream(chunk_stream, batch_size=batch_size, dtype=dtype)
+        elapsed = time.perf_counter() - start
+        print(f"Chunked and embedded {len(new_chunks)} segments ({len(new_chunks) / max(elapsed, 1e-9):.1f} chunks/sec).")
+
+    # Stored vectors of unchanged files are reused, so only new chunks are embedded
+    parts = [part for part in (kept_embeddings, new_embeddings) if part is not None and len(part)]
+    chunks = kept_chunks + new_chunks
+    if parts:
+        embeddings = np.concatenate(parts)
+    elif previous_meta is not None:
+        # Every document is gone; take the width from the old store rather than loading the model for it
+        width = (store or open_vector_store(store_dir)).embeddings.shape[1]
+        embeddings = np.empty((0, width), dtype=dtype)
+    else:
+        print("No chunks to index; the vector store was not written.")
+        manifest["files"] = current
+        save_manifest(manifest, manifest_path)
+        return
+
+    index = build_faiss_index(dequantize(embeddings), index_config["type"], **index_config["build"])
+    sparse_index = BM25Index.build(chunk["text"] for chunk in chunks)
+    meta = save_vector_store(store_dir, index, embeddings, chunks, dtype=dtype, sparse_index=sparse_index,
+                             index_config=index_config)
+    print(f"FAISS index updated with {len(chunks)} chunks (generation {meta['generation']}).")
+
+    manifest["files"] = current
+    save_manifest(manifest, manifest_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Incrementally index PDFs into the vector store.")
+    parser.add_argument("--papers-dir", default=PAPERS_DIR)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--chunk-overlap", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="PDF extraction processes (default: CPU count).")
+    parser.add_argument("--dtype", choices=["float32", "float16", "int8"], default="float32",
+                        help="Storage type of the embedding matrix.")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks per embedding batch.")
+    parser.add_argument("--index-type", choices=INDEX_TYPES, default=None,
+                        help="FAISS index type (default: keep the current one, or flat). See tune_index.py.")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and rebuild everything.")
+    sharding = parser.add_mutually_exclusive_group()
+    sharding.add_argument("--shard", help="Index --papers-dir as its own shard (e.g. one per corpus).")
+    sharding.add_argument("--num-shards", type=int,
+                          help="Hash-partition --papers-dir across this many shards. Files move between shards "
+                               "when this changes; delete leftover part-NN directories after lowering it.")
+    args = parser.parse_args()
 
-    embedded_chunks = embed_chunks(chunks)
-    print("Embeddings generated.")
+    options = dict(chunk_size=args.chunk_size, chunk_overlap=args.chunk_overlap, full=args.full, workers=args.workers,
+                   dtype=args.dtype, batch_size=args.batch_size, index_type=args.index_type)
+    shards_dir = os.path.join(args.store_dir, SHARDS_DIR)
 
-    os.makedirs("vector_store", exist_ok=True)
-    build_faiss_index(embedded_chunks)
-    print("FAISS index created and stored.")
+    if args.shard:
+        ingest(args.papers_dir, os.path.join(shards_dir, args.shard), **options)
+    elif args.num_shards:
+        partitions = {}
+        for filename in os.listdir(args.papers_dir):
+            if filename.endswith(".pdf"):
+                partitions.setdefault(shard_for(filename, args.num_shards), set()).add(filename)
+        for i in range(args.num_shards):
+            name = f"part-{i:02d}"
+            print(f"--- Shard {name}")
+            ingest(args.papers_dir, os.path.join(shards_dir, name), include=partitions.get(name, set()), **options)
+    else:
+        ingest(args.papers_dir, args.store_dir, **options)
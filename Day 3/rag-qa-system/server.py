@@ -0,0 +1,70 @@
+# server.py
+
+import os
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI
+from pydantic import BaseModel
+
+from answer_generator import agenerate_answer
+from src.batcher import MicroBatcher
+from src.models import model_stats
+from src.query_engine import answer_cache, cache_stats, index_holder, retrieve_many
+
+TOP_K = 5
+
+
+def _retrieve_batch(questions):
+    generation, results = retrieve_many(questions, top_k=TOP_K)
+    return [(generation, embedding, sources) for embedding, sources in results]
+
+
+# Concurrent questions arriving within a few ms share one model.encode and one FAISS search
+batcher = MicroBatcher(
+    _retrieve_batch,
+    max_batch_size=int(os.getenv("RAG_MAX_BATCH_SIZE", "32")),
+    max_wait_ms=float(os.getenv("RAG_MAX_BATCH_WAIT_MS", "5")),
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    batcher.start()
+    yield
+    await batcher.stop()
+
+
+app = FastAPI(title="RAG QA on AI Papers", lifespan=lifespan)
+
+
+class QueryRequest(BaseModel):
+    question: str
+
+
+@app.post("/query")
+async def query(request: QueryRequest):
+    generation, query_embedding, sources = await batcher.submit(request.question)
+
+    cached = answer_cache.lookup(query_embedding)
+    if cached is not None:
+        return {**cached, "cached": True}
+
+    answer = await agenerate_answer(request.question, sources)
+    result = {"answer": answer, "sources": sources}
+    answer_cache.add(query_embedding, result, generation)
+    return {**result, "cached": False}
+
+
+@app.get("/stats")
+async def stats():
+    return {
+        "index": index_holder.stats(),
+        "caches": cache_stats(),
+        "batcher": batcher.stats(),
+        "models": model_stats(),
+    }
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host=os.getenv("HOST", "127.0.0.1"), port=int(os.getenv("PORT", "8000")))
@@ -0,0 +1,127 @@
+# src/ann.py
+"""FAISS index types beyond exact search, and a tuner that trades recall for latency."""
+
+import math
+import time
+
+import faiss
+import numpy as np
+
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+NPROBE_GRID = (1, 2, 4, 8, 16, 32, 64, 128)
+EF_SEARCH_GRID = (16, 32, 64, 128, 256)
+DEFAULT_INDEX_CONFIG = {"type": "flat", "build": {}, "search": {}}
+
+
+def default_build_params(index_type, n, dim):
+    if index_type in ("ivf_flat", "ivf_pq"):
+        params = {"nlist": max(1, int(4 * math.sqrt(n)))}
+        if index_type == "ivf_pq":
+            # Sub-quantizers must divide the dimension; aim for ~8 dims each
+            m = max(1, dim // 8)
+            while dim % m:
+                m -= 1
+            params.update(m=m, nbits=8)
+        return params
+    if index_type == "hnsw":
+        return {"M": 32, "efConstruction": 200}
+    return {}
+
+
+def build_index(embeddings, index_type="flat", **params):
+    """Build and fill a FAISS index of ``index_type`` over float32 ``embeddings``."""
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    n, dim = embeddings.shape
+    params = {**default_build_params(index_type, n, dim), **params}
+
+    # IVF indexes cannot be trained on nothing, and an empty index needs no structure
+    if n == 0 or index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["M"])
+        index.hnsw.efConstruction = params["efConstruction"]
+    else:
+        # Training needs at least one vector per list (and per PQ centroid)
+        nlist = max(1, min(params["nlist"], n))
+        quantizer = faiss.IndexFlatL2(dim)
+        if index_type == "ivf_flat":
+            index = faiss.IndexIVFFlat(quantizer, dim, nlist)
+        else:
+            nbits = max(1, min(params["nbits"], int(math.log2(max(n, 2)))))
+            index = faiss.IndexIVFPQ(quantizer, dim, nlist, params["m"], nbits)
+        index.train(embeddings)
+
+    index.add(embeddings)
+    return index
+
+
+def apply_search_params(index, search_params):
+    """Set query-time knobs such as ``nprobe`` (IVF) or ``efSearch`` (HNSW) on ``index``."""
+    # Empty stores are built as flat indexes, which have no knobs
+    if not search_params or index.ntotal == 0:
+        return index
+    space = faiss.ParameterSpace()
+    for name, value in search_params.items():
+        space.set_index_parameter(index, name, value)
+    return index
+
+
+def recall_at_k(found, truth):
+    hits = sum(len(set(f[f != -1]) & set(t)) for f, t in zip(found, truth))
+    return hits / truth.size
+
+
+def _search_grid(index_type):
+    if index_type in ("ivf_flat", "ivf_pq"):
+        return [{"nprobe": nprobe} for nprobe in NPROBE_GRID]
+    if index_type == "hnsw":
+        return [{"efSearch": ef} for ef in EF_SEARCH_GRID]
+    return [{}]
+
+
+def tune_index(embeddings, target_recall=0.95, k=10, num_queries=200, index_types=INDEX_TYPES, seed=0):
+    """Pick the fastest index configuration whose recall@k meets ``target_recall``.
+
+    A random sample of rows is held out as queries; the rest are indexed. Every
+    candidate is scored against exact search over the same rows. Returns the
+    winning configuration plus the measurements of every candidate tried.
+    """
+    embeddings = np.ascontiguousarray(embeddings, dtype="float32")
+    n = len(embeddings)
+    rng = np.random.default_rng(seed)
+    held_out = rng.choice(n, size=min(num_queries, max(n // 10, 1)), replace=False)
+    mask = np.ones(n, dtype=bool)
+    mask[held_out] = False
+    base, queries = embeddings[mask], embeddings[held_out]
+    k = min(k, len(base))
+
+    _, truth = build_index(base, "flat").search(queries, k)
+
+    trials = []
+    for index_type in index_types:
+        build_params = default_build_params(index_type, n, embeddings.shape[1])
+        index = build_index(base, index_type, **build_params)
+        for search_params in _search_grid(index_type):
+            apply_search_params(index, search_params)
+            start = time.perf_counter()
+            _, found = index.search(queries, k)
+            latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+            trials.append({
+                "type": index_type,
+                "build": build_params,
+                "search": search_params,
+                "recall": recall_at_k(found, truth),
+                "latency_ms": latency_ms,
+            })
+            # Larger nprobe/efSearch only costs more once the target is met
+            if trials[-1]["recall"] >= target_recall:
+                break
+
+    passing = [trial for trial in trials if trial["recall"] >= target_recall]
+    if passing:
+        best = min(passing, key=lambda trial: trial["latency_ms"])
+    else:
+        best = max(trials, key=lambda trial: trial["recall"])
+    return best, trials
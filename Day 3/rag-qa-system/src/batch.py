@@ -0,0 +1,118 @@
+# src/batch.py
+"""Concurrent batch question answering over the vector store, with resumable JSONL output."""
+
+import asyncio
+import json
+import os
+
+from src.retriever import retrieve_batch
+
+
+class AsyncRateLimiter:
+    """Spaces acquisitions out to at most ``rate`` per second (no limit when ``rate`` is falsy)."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            now = asyncio.get_running_loop().time()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class StubLLM:
+    """Offline stand-in for the OpenAI call: sleeps ``latency`` seconds, then cites every source."""
+
+    def __init__(self, latency=0.2):
+        self.latency = latency
+
+    async def __call__(self, query, context_chunks):
+        await asyncio.sleep(self.latency)
+        citations = "".join(f"[{i}]" for i in range(1, len(context_chunks) + 1))
+        return f"Stub answer to: {query} {citations}"
+
+
+def read_questions(path):
+    questions = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, start=1):
+            if line.strip():
+                record = json.loads(line)
+                questions.append({"id": str(record.get("id", line_number)), "question": record["question"]})
+    return questions
+
+
+def completed_ids(path):
+    """Ids already answered in ``path``; failed questions are retried on the next run."""
+    if not os.path.exists(path):
+        return set()
+    done = set()
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A line cut short by a crash is simply answered again
+                continue
+            if "error" not in record:
+                done.add(record["id"])
+    return done
+
+
+async def run_batch(questions, store, output_path, generate, top_k=5, concurrency=8, rate_limit=None,
+                    timeout=60.0, block_size=256):
+    """Answer ``questions`` and append one JSON record per question to ``output_path``.
+
+    Queries are retrieved ``block_size`` at a time with one batched encode and one
+    FAISS matrix search, in a worker thread so generation of the previous block
+    keeps going meanwhile. At most ``concurrency`` ``generate(question, sources)``
+    calls run at once, started no faster than ``rate_limit`` per second.
+    """
+    done = completed_ids(output_path)
+    pending = [question for question in questions if question["id"] not in done]
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = AsyncRateLimiter(rate_limit)
+    loop = asyncio.get_running_loop()
+    counts = {"skipped": len(questions) - len(pending), "answered": 0, "failed": 0}
+
+    with open(output_path, "a") as out:
+        async def answer_one(question, sources):
+            async with semaphore:
+                await limiter.acquire()
+                record = {
+                    "id": question["id"],
+                    "question": question["question"],
+                    "sources": [
+                        {"filename": chunk["filename"], "chunk_id": chunk.get("chunk_id"), "score": chunk["score"]}
+                        for chunk in sources
+                    ],
+                }
+                try:
+                    record["answer"] = await asyncio.wait_for(generate(question["question"], sources), timeout)
+                    counts["answered"] += 1
+                except Exception as e:
+                    record["error"] = repr(e)
+                    counts["failed"] += 1
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+
+        in_flight = []
+        for start in range(0, len(pending), block_size):
+            block = pending[start:start + block_size]
+            sources = await loop.run_in_executor(
+                None, lambda: retrieve_batch([q["question"] for q in block], store.index, store.chunks,
+                                             top_k=top_k, sparse_index=store.sparse)
+            )
+            # Wait for the block before last, so only two blocks of sources are held at once
+            await asyncio.gather(*in_flight)
+            in_flight = [asyncio.create_task(answer_one(q, s)) for q, s in zip(block, sources)]
+        await asyncio.gather(*in_flight)
+
+    return counts
@@ -0,0 +1,108 @@
+# src/cache.py
+"""Query-embedding LRU and semantic answer cache used by query_rag."""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def normalize_query(text):
+    return " ".join(text.lower().split()).rstrip("?!. ")
+
+
+class EmbeddingCache:
+    """LRU of normalised query text -> query embedding."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, query, encode):
+        key = normalize_query(query)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        embedding = encode(query)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return embedding
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+class SemanticAnswerCache:
+    """Answers keyed by query embedding, matched by cosine similarity.
+
+    Embeddings are expected to be unit-normalised, so cosine similarity is a dot
+    product against a matrix of cached queries, allocated once the embedding size
+    is known. Entries belong to one index generation and are dropped when the
+    generation changes.
+    """
+
+    def __init__(self, threshold=0.95, max_entries=512):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embeddings = None
+        self._values = [None] * max_entries
+        self._last_used = np.zeros(max_entries, dtype=np.float64)
+        self._size = 0
+        self._generation = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def sync_generation(self, generation):
+        with self._lock:
+            if generation != self._generation:
+                self._size = 0
+                self._values = [None] * self.max_entries
+                self._generation = generation
+
+    def lookup(self, embedding):
+        with self._lock:
+            if self._size:
+                similarities = self._embeddings[:self._size] @ np.asarray(embedding, dtype=np.float32).ravel()
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self._last_used[best] = time.monotonic()
+                    self.hits += 1
+                    return self._values[best]
+            self.misses += 1
+            return None
+
+    def add(self, embedding, value, generation):
+        with self._lock:
+            # An answer computed against an index that has since been replaced is not cached
+            if generation != self._generation:
+                return
+            if self._size < self.max_entries:
+                slot = self._size
+                self._size += 1
+            else:
+                slot = int(np.argmin(self._last_used))
+            embedding = np.asarray(embedding, dtype=np.float32).ravel()
+            if self._embeddings is None:
+                self._embeddings = np.zeros((self.max_entries, len(embedding)), dtype=np.float32)
+            self._embeddings[slot] = embedding
+            self._values[slot] = value
+            self._last_used[slot] = time.monotonic()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {"entries": self._size, "hits": self.hits, "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0, "generation": self._generation}
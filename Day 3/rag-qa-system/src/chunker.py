@@ -1,6 +1,11 @@
 # src/chunker.py
+from bisect import bisect_right
+from itertools import groupby
+
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 
+SEPARATORS = ["\n\n", "\n", ". ", " "]
+
 def chunk_documents(documents, chunk_size=1000, chunk_overlap=200):
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
@@ -16,3 +21,88 @@ def chunk_documents(documents, chunk_size=1000, chunk_overlap=200):
                 "chunk_id": i
             })
     return chunks
+
+def _cut_point(text, chunk_size):
+    """End of the next chunk: the last separator in the second half of the window, else a hard cut."""
+    window = text[:chunk_size]
+    for separator in SEPARATORS:
+        position = window.rfind(separator)
+        if position >= chunk_size // 2:
+            return position + len(separator)
+    return chunk_size
+
+def _next_start(text, end, chunk_overlap):
+    """Start of the following chunk: ``chunk_overlap`` chars back from ``end``, moved to a word boundary."""
+    if chunk_overlap <= 0:
+        return end
+    start = max(end - chunk_overlap, 1)
+    for position in range(start, end):
+        if text[position].isspace():
+            return position + 1
+    return start
+
+def _stream_file_chunks(filename, pages, chunk_size, chunk_overlap):
+    buffer = ""
+    buffer_offset = 0        # document offset of buffer[0]
+    page_starts = []         # document offsets where each page begins
+    page_numbers = []
+    document_length = 0
+    chunk_id = 0
+
+    def page_at(offset):
+        return page_numbers[max(bisect_right(page_starts, offset) - 1, 0)]
+
+    def emit(end):
+        nonlocal chunk_id
+        raw = buffer[:end]
+        text = raw.strip()
+        if not text:
+            return None
+        start = buffer_offset + (len(raw) - len(raw.lstrip()))
+        chunk = {
+            "text": text,
+            "filename": filename,
+            "chunk_id": chunk_id,
+            "page": page_at(start),
+            "page_end": page_at(start + len(text) - 1),
+            "char_start": start,
+            "char_end": start + len(text),
+        }
+        chunk_id += 1
+        return chunk
+
+    for page in pages:
+        page_starts.append(document_length)
+        page_numbers.append(page["page"])
+        document_length += len(page["text"])
+        buffer += page["text"]
+
+        # Any cut inside the first chunk_size chars is final once more text is buffered
+        while len(buffer) > chunk_size:
+            end = _cut_point(buffer, chunk_size)
+            chunk = emit(end)
+            if chunk is not None:
+                yield chunk
+            start = _next_start(buffer, end, chunk_overlap)
+            buffer = buffer[start:]
+            buffer_offset += start
+
+        # Pages wholly before the buffer are no longer needed, bar the one it starts in
+        first_needed = max(bisect_right(page_starts, buffer_offset) - 1, 0)
+        del page_starts[:first_needed], page_numbers[:first_needed]
+
+    chunk = emit(len(buffer))
+    if chunk is not None:
+        yield chunk
+
+def stream_chunks(pages, chunk_size=1000, chunk_overlap=200):
+    """Chunk a per-page record stream (see loader.iter_pdf_pages) lazily, file by file.
+
+    Only about one chunk plus one page of text is held at a time, however long the
+    document. Each chunk records its first and last page and its character span
+    [char_start, char_end) within the file's concatenated page text.
+    """
+    if chunk_overlap >= chunk_size:
+        raise ValueError("chunk_overlap must be smaller than chunk_size")
+    for filename, file_pages in groupby(pages, key=lambda page: page["filename"]):
+        yield from _stream_file_chunks(filename, file_pages, chunk_size, chunk_overlap)
@@ -0,0 +1,127 @@
+# src/context.py
+"""Packs retrieved chunks into a token-budgeted prompt context."""
+
+import threading
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """The tiktoken encoding, loaded on first use; None if it can't be loaded.
+
+    get_encoding downloads the BPE file the first time, so an offline host must
+    fall back to the character estimate rather than fail.
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception:
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text):
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # Rough fallback for English prose when tiktoken is unavailable
+    return max(1, len(text) // 4)
+
+
+def truncate_to_tokens(text, max_tokens):
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+def _overlap(left, right, max_overlap=400):
+    """Length of the longest suffix of ``left`` that is also a prefix of ``right``."""
+    for size in range(min(len(left), len(right), max_overlap), 0, -1):
+        if left.endswith(right[:size]):
+            return size
+    return 0
+
+
+def _continues(block, chunk):
+    """Whether ``chunk`` directly follows or overlaps the end of ``block`` in the same file."""
+    if block["filename"] != chunk["filename"]:
+        return False
+    if block["char_end"] is not None and "char_start" in chunk:
+        return block["char_start"] <= chunk["char_start"] <= block["char_end"]
+    return chunk.get("chunk_id", 0) == block["last_chunk_id"] + 1
+
+
+def _new_text(block, chunk, text):
+    """The part of ``text`` not already in ``block``; exact when chunks carry character offsets."""
+    if block["char_end"] is not None and "char_start" in chunk:
+        return text[max(block["char_end"] - chunk["char_start"], 0):]
+    return text[_overlap(block["text"], text):]
+
+
+def merge_adjacent(chunks):
+    """Group retrieved chunks into blocks of consecutive chunks from the same file.
+
+    Each chunk is cited by its 1-based position in ``chunks``, so citation
+    numbers match the sources list no matter how blocks are merged or dropped.
+    Text repeated by the chunker's overlap, or retrieved twice, is kept once.
+    Chunks from the streaming chunker carry character offsets, which make the
+    overlap exact; older chunks fall back to matching text.
+    """
+    numbered = sorted(
+        enumerate(chunks, start=1),
+        key=lambda item: (item[1]["filename"], item[1].get("char_start", 0), item[1].get("chunk_id", 0)),
+    )
+    blocks = []
+    seen_texts = set()
+    for number, chunk in numbered:
+        text = chunk["text"] if "char_start" in chunk else chunk["text"].strip()
+        if text in seen_texts:
+            continue
+        seen_texts.add(text)
+
+        last = blocks[-1] if blocks else None
+        if last is not None and _continues(last, chunk):
+            last["text"] += _new_text(last, chunk, text)
+            last["numbers"].append(number)
+            last["last_chunk_id"] = chunk.get("chunk_id", 0)
+            if last["char_end"] is not None:
+                last["char_end"] = max(last["char_end"], chunk["char_end"])
+            last["score"] = max(last["score"], chunk.get("score", 0.0))
+        else:
+            blocks.append({
+                "filename": chunk["filename"],
+                "text": text,
+                "numbers": [number],
+                "last_chunk_id": chunk.get("chunk_id", 0),
+                "char_start": chunk.get("char_start"),
+                "char_end": chunk.get("char_end"),
+                "score": chunk.get("score", 0.0),
+            })
+    return blocks
+
+
+def pack_context(chunks, token_budget=2000):
+    """Render merged blocks, best retrieval score first, until ``token_budget`` is used up."""
+    blocks = sorted(merge_adjacent(chunks), key=lambda block: (-block["score"], block["numbers"][0]))
+    parts = []
+    remaining = token_budget
+    for block in blocks:
+        label = "".join(f"[{number}]" for number in sorted(block["numbers"]))
+        header = f"{label} (source: {block['filename']})\n"
+        cost = count_tokens(header) + count_tokens(block["text"])
+        if cost <= remaining:
+            parts.append(header + block["text"])
+            remaining -= cost
+        elif not parts:
+            # Always send something: trim the best block to fit
+            parts.append(header + truncate_to_tokens(block["text"], max(0, remaining - count_tokens(header))))
+            remaining = 0
+    return "\n\n".join(parts)
@@ -1,14 +1,55 @@
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby, islice
 import fitz  
 
-def load_pdfs_from_directory(folder_path):
-    documents = []
-    for filename in os.listdir(folder_path):
-        if filename.endswith(".pdf"):
-            path = os.path.join(folder_path, filename)
-            doc = fitz.open(path)
-            text = ""
-            for page in doc:
-                text += page.get_text()
-            documents.append({"filename": filename, "text": text})
-    return documents
+def extract_pages(path):
+    doc = fitz.open(path)
+    try:
+        return [(page_number, page.get_text()) for page_number, page in enumerate(doc, start=1)]
+    finally:
+        doc.close()
+
+def iter_pdf_pages(paths, workers=None, max_in_flight=None):
+    """Yield {"filename", "page", "text"} records for every page of every PDF.
+
+    Files are extracted in a process pool, with at most ``max_in_flight`` files
+    submitted at once so memory stays bounded. Records come back in input order,
+    all pages of one file together.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max(max_in_flight or 2 * workers, 1)
+    paths = iter(paths)
+
+    if workers == 1:
+        for path in paths:
+            filename = os.path.basename(path)
+            for page_number, text in extract_pages(path):
+                yield {"filename": filename, "page": page_number, "text": text}
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque((path, pool.submit(extract_pages, path)) for path in islice(paths, max_in_flight))
+        while pending:
+            path, future = pending.popleft()
+            pages = future.result()
+            for next_path in islice(paths, 1):
+                pending.append((next_path, pool.submit(extract_pages, next_path)))
+
+            filename = os.path.basename(path)
+            for page_number, text in pages:
+                yield {"filename": filename, "page": page_number, "text": text}
+
+def load_pdfs_from_directory(folder_path, workers=None):
+    """Whole-document records for every PDF in ``folder_path`` (kept for older callers)."""
+    paths = [
+        os.path.join(folder_path, filename)
+        for filename in sorted(os.listdir(folder_path))
+        if filename.endswith(".pdf")
+    ]
+    pages = iter_pdf_pages(paths, workers=workers)
+    return [
+        {"filename": filename, "text": "".join(record["text"] for record in records)}
+        for filename, records in groupby(pages, key=lambda record: record["filename"])
+    ]
@@ -0,0 +1,49 @@
+# src/models.py
+"""Process-wide, lazily loaded SentenceTransformer models shared by ingest and retrieval."""
+
+import os
+import threading
+import time
+
+DEFAULT_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# "torch" (default), "onnx", or "onnx-int8" for the int8-quantised ONNX export on CPU
+DEFAULT_BACKEND = os.getenv("RAG_EMBEDDING_BACKEND", "torch")
+ONNX_INT8_FILE = os.getenv("RAG_ONNX_INT8_FILE", "onnx/model_qint8_avx512_vnni.onnx")
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+_models = {}
+_load_seconds = {}
+_lock = threading.Lock()
+
+
+def _load(name, backend):
+    # Imported here so processes that never embed don't pay for torch/transformers either
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(name)
+    if backend == "onnx":
+        return SentenceTransformer(name, backend="onnx")
+    if backend == "onnx-int8":
+        return SentenceTransformer(name, backend="onnx", model_kwargs={"file_name": ONNX_INT8_FILE})
+    raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+
+
+def get_model(name=None, backend=None):
+    """Return the shared model for (name, backend), loading it on first use."""
+    key = (name or DEFAULT_MODEL, backend or DEFAULT_BACKEND)
+    model = _models.get(key)
+    if model is None:
+        with _lock:
+            model = _models.get(key)
+            if model is None:
+                start = time.perf_counter()
+                model = _load(*key)
+                _load_seconds[key] = time.perf_counter() - start
+                _models[key] = model
+    return model
+
+
+def model_stats():
+    """Cold-start time of every model loaded so far, keyed by "name/backend"."""
+    return {f"{name}/{backend}": {"load_seconds": seconds} for (name, backend), seconds in _load_seconds.items()}
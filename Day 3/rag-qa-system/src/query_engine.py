@@ -1,14 +1,210 @@
 # src/query_engine.py
 
-from src.retriever import load_faiss_index, retrieve_relevant_chunks
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.cache import EmbeddingCache, SemanticAnswerCache
+from src.retriever import encode_queries, encode_query, retrieve_batch, retrieve_relevant_chunks
+from src.shards import SHARDS_DIR, ShardedStore, list_shards
+from src.store import META_FILE, open_vector_store
 from answer_generator import generate_answer
 
-def query_rag(query):
-    index, chunks = load_faiss_index()
-    top_chunks = retrieve_relevant_chunks(query, index, chunks, top_k=5)
+
+class IndexHolder:
+    """Keeps the vector store resident and reloads it when a new generation is written.
+
+    Queries always get a consistent VectorStore snapshot. A reload opens the new
+    generation off to the side and swaps it in with a single assignment, so
+    queries already running keep using the old one and are never blocked.
+    """
+
+    def __init__(self, path="vector_store", check_interval=2.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._reload_lock = threading.Lock()
+        self._snapshot = None
+        self._stamp = None
+        self._last_check = 0.0
+        self.generation = 0
+        self.load_seconds = None
+        self.size_bytes = None
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(os.path.join(self.path, META_FILE))
+        except FileNotFoundError:
+            raise FileNotFoundError(f"No vector store found in {self.path!r}; run preprocess.py first.") from None
+        return stat.st_mtime_ns, stat.st_ino
+
+    def _reload(self):
+        stamp = self._file_stamp()
+        if self._snapshot is not None and self._stamp == stamp:
+            return
+        start = time.perf_counter()
+        store = open_vector_store(self.path)
+        self.load_seconds = time.perf_counter() - start
+        self.size_bytes = store.size_bytes()
+        self.generation = store.generation
+        self._stamp = stamp
+        self._snapshot = store
+
+    def get(self):
+        snapshot = self._snapshot
+        now = time.monotonic()
+        if snapshot is not None and now - self._last_check < self.check_interval:
+            return snapshot
+
+        # Only one thread reloads; the others carry on with the current snapshot
+        if self._reload_lock.acquire(blocking=snapshot is None):
+            try:
+                self._last_check = now
+                self._reload()
+            finally:
+                self._reload_lock.release()
+        return self._snapshot
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            "path": self.path,
+            "generation": self.generation,
+            "load_seconds": self.load_seconds,
+            "size_bytes": self.size_bytes,
+            "num_chunks": len(snapshot.chunks) if snapshot else 0,
+        }
+
+
+class ShardedIndexHolder:
+    """One IndexHolder per shard directory, rescanned so shards can be added or dropped live."""
+
+    def __init__(self, path="vector_store/shards", check_interval=2.0, max_workers=None):
+        self.path = path
+        self.check_interval = check_interval
+        self.holders = {}
+        self._lock = threading.Lock()
+        self._last_scan = 0.0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="shard-search")
+
+    def _rescan(self):
+        names = list_shards(self.path)
+        holders = {
+            name: self.holders.get(name) or IndexHolder(os.path.join(self.path, name), self.check_interval)
+            for name in names
+        }
+        # Replace the mapping in one assignment; snapshots taken earlier keep their stores
+        self.holders = holders
+
+    def get(self):
+        now = time.monotonic()
+        if now - self._last_scan >= self.check_interval:
+            with self._lock:
+                if now - self._last_scan >= self.check_interval:
+                    self._rescan()
+                    self._last_scan = now
+        stores = {}
+        for name, holder in self.holders.items():
+            try:
+                stores[name] = holder.get()
+            except FileNotFoundError:
+                # Dropped since the last scan
+                continue
+        if not stores:
+            raise FileNotFoundError(f"No shards found in {self.path!r}; run preprocess.py --shard or --num-shards.")
+        return ShardedStore(stores, self._pool)
+
+    def stats(self):
+        shard_stats = [holder.stats() for holder in self.holders.values()]
+        loaded = [stats for stats in shard_stats if stats["generation"]]
+        return {
+            "path": self.path,
+            "shards": len(shard_stats),
+            "generation": sum(stats["generation"] for stats in shard_stats),
+            "load_seconds": sum(stats["load_seconds"] for stats in loaded),
+            "size_bytes": sum(stats["size_bytes"] for stats in loaded),
+            "num_chunks": sum(stats["num_chunks"] for stats in shard_stats),
+        }
+
+
+STORE_DIR = "vector_store"
+SHARDS_PATH = os.path.join(STORE_DIR, SHARDS_DIR)
+
+# A store with a shards/ directory is served as a sharded store
+index_holder = ShardedIndexHolder(SHARDS_PATH) if os.path.isdir(SHARDS_PATH) else IndexHolder(STORE_DIR)
+embedding_cache = EmbeddingCache(max_entries=int(os.getenv("RAG_EMBEDDING_CACHE_SIZE", "1024")))
+answer_cache = SemanticAnswerCache(
+    threshold=float(os.getenv("RAG_ANSWER_CACHE_THRESHOLD", "0.95")),
+    max_entries=int(os.getenv("RAG_ANSWER_CACHE_SIZE", "512")),
+)
+
+
+def cache_stats():
+    return {"embeddings": embedding_cache.stats(), "answers": answer_cache.stats()}
+
+
+def _retrieve(store, query, query_embedding, top_k):
+    if isinstance(store, ShardedStore):
+        return store.retrieve(query, query_embedding, top_k=top_k)
+    return retrieve_relevant_chunks(query, store.index, store.chunks, top_k=top_k, sparse_index=store.sparse,
+                                    query_embedding=query_embedding)
+
+
+def retrieve_many(queries, top_k=5):
+    """Encode ``queries`` in one batch and retrieve sources for all of them.
+
+    Returns the store generation plus one (query_embedding, sources) pair per query.
+    """
+    store = index_holder.get()
+    answer_cache.sync_generation(store.generation)
+    embeddings = encode_queries(queries)
+
+    if isinstance(store, ShardedStore):
+        sources = [store.retrieve(query, embeddings[i:i + 1], top_k=top_k) for i, query in enumerate(queries)]
+    else:
+        sources = retrieve_batch(queries, store.index, store.chunks, top_k=top_k, sparse_index=store.sparse,
+                                 query_embeddings=embeddings)
+    return store.generation, [(embeddings[i:i + 1], chunk_list) for i, chunk_list in enumerate(sources)]
+
+
+def _cache_when_complete(tokens, query_embedding, sources, generation):
+    parts = []
+    for token in tokens:
+        parts.append(token)
+        yield token
+    answer_cache.add(query_embedding, {"answer": "".join(parts), "sources": sources}, generation)
+
+
+def query_rag(query, stream=False):
+    """Answer ``query`` from the vector store.
+
+    With ``stream=True`` the sources are returned as soon as retrieval is done and
+    ``answer`` is an iterator of tokens, so callers can render while it generates.
+    """
+    store = index_holder.get()
+    answer_cache.sync_generation(store.generation)
+
+    query_embedding = embedding_cache.get_or_compute(query, encode_query)
+    cached = answer_cache.lookup(query_embedding)
+    if cached is not None:
+        if stream:
+            return {"answer": iter([cached["answer"]]), "sources": cached["sources"]}
+        return cached
+
+    top_chunks = _retrieve(store, query, query_embedding, top_k=5)
+
+    if stream:
+        tokens = generate_answer(query, top_chunks, stream=True)
+        return {
+            "answer": _cache_when_complete(tokens, query_embedding, top_chunks, store.generation),
+            "sources": top_chunks
+        }
+
     answer = generate_answer(query, top_chunks)
 
-    return {
+    result = {
         "answer": answer,
         "sources": top_chunks
     }
+    answer_cache.add(query_embedding, result, store.generation)
+    return result
@@ -1,20 +1,58 @@
-import pickle
 import numpy as np
-from sentence_transformers import SentenceTransformer
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+from src.ann import build_index
+from src.models import get_model
+from src.store import open_vector_store
 
-def load_faiss_index(path="vector_store/index.pkl"):
-    with open(path, "rb") as f:
-        index, chunks = pickle.load(f)
-    return index, chunks
+def build_faiss_index(embeddings, index_type="flat", **build_params):
+    return build_index(embeddings, index_type, **build_params)
 
-def retrieve_relevant_chunks(query, index, chunks, top_k=5):
-    query_embedding = model.encode([query])
-    distances, indices = index.search(np.array(query_embedding), top_k)
+def load_faiss_index(path="vector_store"):
+    store = open_vector_store(path)
+    return store.index, store.chunks
+
+def reciprocal_rank_fusion(rankings, k=60):
+    """Fuse several best-first lists of ids into (id, score) pairs, scoring by sum(1 / (k + rank))."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+def encode_query(query):
+    return encode_queries([query])
+
+def encode_queries(queries, batch_size=64):
+    embeddings = get_model().encode(list(queries), batch_size=batch_size, normalize_embeddings=True)
+    return np.asarray(embeddings, dtype="float32")
+
+def retrieve_relevant_chunks(query, index, chunks, top_k=5, sparse_index=None, candidates=20, query_embedding=None):
+    """Dense FAISS search, fused with BM25 keyword search when ``sparse_index`` is given."""
+    depth = max(top_k, candidates) if sparse_index is not None else top_k
+    if query_embedding is None:
+        query_embedding = encode_query(query)
+    distances, indices = index.search(query_embedding, depth)
+    rankings = [[int(i) for i in indices[0] if i != -1]]
+
+    if sparse_index is not None:
+        sparse_ids, _ = sparse_index.search(query, depth)
+        rankings.append([int(i) for i in sparse_ids])
+
+    # A single ranking goes through RRF too, so every result carries a comparable score
+    return [dict(chunks[i], score=score) for i, score in reciprocal_rank_fusion(rankings)[:top_k]]
+
+def retrieve_batch(queries, index, chunks, top_k=5, sparse_index=None, candidates=20, query_embeddings=None):
+    """retrieve_relevant_chunks for many queries: one batched encode and one FAISS matrix search."""
+    depth = max(top_k, candidates) if sparse_index is not None else top_k
+    if query_embeddings is None:
+        query_embeddings = encode_queries(queries)
+    distances, indices = index.search(np.ascontiguousarray(query_embeddings, dtype="float32"), depth)
 
     results = []
-    for i in indices[0]:
-        results.append(chunks[i])
+    for query, row in zip(queries, indices):
+        rankings = [[int(i) for i in row if i != -1]]
+        if sparse_index is not None:
+            sparse_ids, _ = sparse_index.search(query, depth)
+            rankings.append([int(i) for i in sparse_ids])
+        results.append([dict(chunks[i], score=score) for i, score in reciprocal_rank_fusion(rankings)[:top_k]])
     return results
-
@@ -0,0 +1,84 @@
+# src/shards.py
+"""Several independent vector stores searched as one.
+
+Each shard is an ordinary store directory (see src/store.py) under
+``vector_store/shards/<name>/``: one per corpus, or ``part-NN`` when a corpus
+is hash-partitioned by filename. Shards are built, replaced and removed on
+their own, so adding or dropping one never needs a global rebuild.
+"""
+
+import hashlib
+import heapq
+import os
+
+from src.retriever import reciprocal_rank_fusion
+from src.store import META_FILE
+
+SHARDS_DIR = "shards"
+
+
+def shard_for(filename, num_shards):
+    """Stable hash partition of a file onto one of ``num_shards`` shards."""
+    digest = int(hashlib.sha1(filename.encode("utf-8")).hexdigest()[:8], 16)
+    return f"part-{digest % num_shards:02d}"
+
+
+def store_dir_for(store_dir, shard=None):
+    """Directory of one shard of ``store_dir``, or ``store_dir`` itself when ``shard`` is None."""
+    return os.path.join(store_dir, SHARDS_DIR, shard) if shard else store_dir
+
+
+def list_shards(path):
+    if not os.path.isdir(path):
+        return []
+    return sorted(
+        entry.name for entry in os.scandir(path)
+        if entry.is_dir() and os.path.exists(os.path.join(entry.path, META_FILE))
+    )
+
+
+def _search_shard(name, store, query, query_embedding, depth):
+    distances, indices = store.index.search(query_embedding, depth)
+    dense = [(float(d), name, int(i)) for d, i in zip(distances[0], indices[0]) if i != -1]
+    sparse = []
+    if store.sparse is not None:
+        ids, scores = store.sparse.search(query, depth)
+        sparse = [(float(s), name, int(i)) for s, i in zip(scores, ids)]
+    return dense, sparse
+
+
+class ShardedStore:
+    """A consistent snapshot of every shard, searched in parallel on ``pool``."""
+
+    def __init__(self, stores, pool):
+        self.stores = stores
+        self.pool = pool
+
+    @property
+    def generation(self):
+        return tuple(sorted((name, store.generation) for name, store in self.stores.items()))
+
+    def __len__(self):
+        return sum(len(store.chunks) for store in self.stores.values())
+
+    def retrieve(self, query, query_embedding, top_k=5, candidates=20):
+        depth = max(top_k, candidates)
+        futures = [
+            self.pool.submit(_search_shard, name, store, query, query_embedding, depth)
+            for name, store in self.stores.items()
+        ]
+        dense, sparse = [], []
+        for future in futures:
+            shard_dense, shard_sparse = future.result()
+            dense.append(shard_dense)
+            sparse.append(shard_sparse)
+
+        # Every shard returns its hits best-first, so a k-way heap merge gives the global order.
+        # L2 distances share one embedding space; BM25 scores are per-shard but close enough to rank.
+        dense_ranking = [(name, i) for _, name, i in heapq.merge(*dense)][:depth]
+        sparse_ranking = [(name, i) for _, name, i in heapq.merge(*sparse, key=lambda hit: -hit[0])][:depth]
+
+        results = []
+        for (name, i), score in reciprocal_rank_fusion([dense_ranking, sparse_ranking])[:top_k]:
+            results.append(dict(self.stores[name].chunks[i], score=score, shard=name))
+        return results
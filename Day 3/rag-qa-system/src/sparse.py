@@ -0,0 +1,116 @@
+# src/sparse.py
+"""BM25 inverted index over chunk text, stored as flat numpy arrays next to the FAISS index."""
+
+import json
+import os
+import re
+from collections import Counter
+
+import numpy as np
+
+VOCAB_FILE = "bm25.vocab.json"
+OFFSETS_FILE = "bm25.offsets.npy"
+DOCS_FILE = "bm25.docs.npy"
+TFS_FILE = "bm25.tfs.npy"
+DOC_LENGTHS_FILE = "bm25.doclen.npy"
+
+# Keeps model names, dataset names and equation labels such as "gpt-4", "bert_base" or "eq.3" whole
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this to was were which with".split()
+)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    def __init__(self, vocab, offsets, docs, tfs, doc_lengths, k1=1.5, b=0.75):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.docs = docs
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self.avg_doc_length = (float(doc_lengths.mean()) if len(doc_lengths) else 0.0) or 1.0
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @classmethod
+    def build(cls, texts, k1=1.5, b=0.75):
+        postings = {}
+        doc_lengths = []
+        for doc_id, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths.append(len(tokens))
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        vocab = {term: term_id for term_id, term in enumerate(sorted(postings))}
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        docs, tfs = [], []
+        for term, term_id in vocab.items():
+            entries = postings[term]
+            offsets[term_id + 1] = offsets[term_id] + len(entries)
+            docs.extend(doc_id for doc_id, _ in entries)
+            tfs.extend(tf for _, tf in entries)
+
+        return cls(
+            vocab,
+            offsets,
+            np.asarray(docs, dtype=np.int32),
+            np.asarray(tfs, dtype=np.float32),
+            np.asarray(doc_lengths, dtype=np.float32),
+            k1=k1,
+            b=b,
+        )
+
+    def search(self, query, top_k=20):
+        """Return (doc_ids, scores) of the ``top_k`` best BM25 matches, best first."""
+        term_ids = {self.vocab[term] for term in tokenize(query) if term in self.vocab}
+        if not term_ids or not len(self):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        doc_parts, score_parts = [], []
+        for term_id in term_ids:
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            docs = self.docs[start:end]
+            tfs = self.tfs[start:end]
+            idf = np.log(1.0 + (len(self) - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[docs] / self.avg_doc_length)
+            doc_parts.append(docs)
+            score_parts.append(idf * tfs * (self.k1 + 1.0) / (tfs + norm))
+
+        # Sum per-term contributions over only the documents that matched
+        doc_ids, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(score_parts)).astype(np.float32)
+
+        if len(doc_ids) > top_k:
+            best = np.argpartition(-scores, top_k)[:top_k]
+            doc_ids, scores = doc_ids[best], scores[best]
+        order = np.argsort(-scores, kind="stable")
+        return doc_ids[order], scores[order]
+
+    def save(self, data_dir):
+        with open(os.path.join(data_dir, VOCAB_FILE), "w") as f:
+            json.dump({"k1": self.k1, "b": self.b, "terms": self.vocab}, f)
+        np.save(os.path.join(data_dir, OFFSETS_FILE), self.offsets)
+        np.save(os.path.join(data_dir, DOCS_FILE), self.docs)
+        np.save(os.path.join(data_dir, TFS_FILE), self.tfs)
+        np.save(os.path.join(data_dir, DOC_LENGTHS_FILE), self.doc_lengths)
+
+    @classmethod
+    def load(cls, data_dir):
+        vocab_path = os.path.join(data_dir, VOCAB_FILE)
+        if not os.path.exists(vocab_path):
+            return None
+        with open(vocab_path) as f:
+            header = json.load(f)
+        arrays = [
+            np.load(os.path.join(data_dir, name), mmap_mode="r")
+            for name in (OFFSETS_FILE, DOCS_FILE, TFS_FILE, DOC_LENGTHS_FILE)
+        ]
+        return cls(header["terms"], *arrays, k1=header["k1"], b=header["b"])
@@ -0,0 +1,182 @@
+# src/store.py
+"""On-disk vector store that can be memory-mapped instead of unpickled.
+
+A store directory looks like this:
+
+    vector_store/
+    ├── meta.json                 # current generation + format info, replaced atomically
+    └── gen-000007/
+        ├── index.faiss           # FAISS index in its native format
+        ├── embeddings.npy        # contiguous (n, dim) float32/float16/int8 embedding matrix
+        ├── chunks.jsonl          # one JSON record per chunk (text + metadata)
+        ├── chunks.offsets.npy    # n + 1 byte offsets into chunks.jsonl
+        └── bm25.*                # sparse inverted index over chunk text (see src/sparse.py)
+
+Every write goes to a fresh generation directory and only becomes visible once
+meta.json points at it, so readers never see a half-written store.
+"""
+
+import json
+import mmap
+import os
+import shutil
+from collections.abc import Sequence
+
+import faiss
+import numpy as np
+
+from src.ann import DEFAULT_INDEX_CONFIG, apply_search_params
+from src.sparse import BM25Index
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+INDEX_FILE = "index.faiss"
+EMBEDDINGS_FILE = "embeddings.npy"
+CHUNKS_FILE = "chunks.jsonl"
+OFFSETS_FILE = "chunks.offsets.npy"
+KEEP_GENERATIONS = 2
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+INT8_SCALE = 127.0
+
+
+def quantize(vectors, dtype):
+    """Convert float vectors to the storage dtype. int8 assumes unit-normalised vectors."""
+    vectors = np.asarray(vectors)
+    if vectors.dtype == np.dtype(dtype):
+        return vectors
+    if dtype == "int8":
+        return np.clip(np.rint(vectors * INT8_SCALE), -127, 127).astype(np.int8)
+    return vectors.astype(dtype)
+
+
+def dequantize(matrix):
+    """Return a float32 copy of a stored embedding matrix, as FAISS expects."""
+    if matrix.dtype == np.int8:
+        return np.asarray(matrix, dtype=np.float32) / INT8_SCALE
+    return np.ascontiguousarray(matrix, dtype=np.float32)
+
+
+class ChunkStore(Sequence):
+    """Read-only, lazily decoded view over chunks.jsonl."""
+
+    def __init__(self, data_dir):
+        self.offsets = np.load(os.path.join(data_dir, OFFSETS_FILE), mmap_mode="r")
+        path = os.path.join(data_dir, CHUNKS_FILE)
+        if os.path.getsize(path):
+            with open(path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._data = b""
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("chunk index out of range")
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return json.loads(self._data[start:end])
+
+
+class VectorStore:
+    def __init__(self, path, meta, index, embeddings, chunks, sparse=None):
+        self.path = path
+        self.meta = meta
+        self.index = index
+        self.embeddings = embeddings
+        self.chunks = chunks
+        self.sparse = sparse
+
+    @property
+    def generation(self):
+        return self.meta["generation"]
+
+    @property
+    def data_dir(self):
+        return os.path.join(self.path, self.meta["data_dir"])
+
+    @property
+    def index_config(self):
+        return self.meta.get("index", DEFAULT_INDEX_CONFIG)
+
+    def size_bytes(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.data_dir))
+
+
+def read_meta(path):
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def open_vector_store(path="vector_store"):
+    meta = read_meta(path)
+    if meta is None:
+        raise FileNotFoundError(f"No vector store found in {path!r}; run preprocess.py first.")
+    data_dir = os.path.join(path, meta["data_dir"])
+
+    # Memory-mapped pieces are shared through the page cache by every process
+    io_flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+    index = faiss.read_index(os.path.join(data_dir, INDEX_FILE), io_flags)
+    # Tuned nprobe / efSearch are stored with the index and applied here, once
+    apply_search_params(index, meta.get("index", DEFAULT_INDEX_CONFIG)["search"])
+    embeddings = np.load(os.path.join(data_dir, EMBEDDINGS_FILE), mmap_mode="r")
+    chunks = ChunkStore(data_dir)
+    sparse = BM25Index.load(data_dir)
+    return VectorStore(path, meta, index, embeddings, chunks, sparse)
+
+
+def save_vector_store(path, index, embeddings, chunks, dtype="float32", sparse_index=None, index_config=None,
+                      **extra_meta):
+    os.makedirs(path, exist_ok=True)
+    previous = read_meta(path)
+    generation = previous["generation"] + 1 if previous else 1
+    data_name = f"gen-{generation:06d}"
+    data_dir = os.path.join(path, data_name)
+    if os.path.exists(data_dir):
+        shutil.rmtree(data_dir)
+    os.makedirs(data_dir)
+
+    faiss.write_index(index, os.path.join(data_dir, INDEX_FILE))
+    np.save(os.path.join(data_dir, EMBEDDINGS_FILE), np.ascontiguousarray(quantize(embeddings, dtype)))
+
+    offsets = np.zeros(len(chunks) + 1, dtype=np.uint64)
+    with open(os.path.join(data_dir, CHUNKS_FILE), "wb") as f:
+        for i, chunk in enumerate(chunks):
+            f.write(json.dumps(chunk, ensure_ascii=False).encode("utf-8") + b"\n")
+            offsets[i + 1] = f.tell()
+    np.save(os.path.join(data_dir, OFFSETS_FILE), offsets)
+    if sparse_index is not None:
+        sparse_index.save(data_dir)
+
+    meta = {
+        "version": FORMAT_VERSION,
+        "generation": generation,
+        "data_dir": data_name,
+        "count": len(chunks),
+        "dim": int(embeddings.shape[1]),
+        "dtype": dtype,
+        "index": index_config or DEFAULT_INDEX_CONFIG,
+        **extra_meta,
+    }
+    tmp_path = os.path.join(path, META_FILE + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(tmp_path, os.path.join(path, META_FILE))
+
+    _prune_generations(path, generation)
+    return meta
+
+
+def _prune_generations(path, current):
+    # Keep the previous generation around for readers that opened meta.json just before the swap
+    for entry in os.scandir(path):
+        if entry.is_dir() and entry.name.startswith("gen-"):
+            if int(entry.name[4:]) <= current - KEEP_GENERATIONS:
+                shutil.rmtree(entry.path, ignore_errors=True)
@@ -1,12 +1,40 @@
 # src/vectorizer.py
-from sentence_transformers import SentenceTransformer
 import numpy as np
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+from src.models import get_model
+from src.store import EMBEDDING_DTYPES, quantize
 
-def embed_chunks(chunks):
-    texts = [chunk["text"] for chunk in chunks]
-    embeddings = model.encode(texts)
-    for i, chunk in enumerate(chunks):
-        chunk["embedding"] = embeddings[i]
-    return chunks
+def embed_texts(texts, batch_size=64, dtype="float32", normalize=True, sort_window=None):
+    """Embed ``texts`` into a preallocated (n, dim) matrix of ``dtype``, rows in input order.
+
+    Texts are encoded in batches of similar length so little work is spent on
+    padding: each window of ``sort_window`` texts is sorted by length before it is
+    cut into batches. Vectors are unit-normalised, then cast or quantised batch
+    by batch, so no full float32 copy of the corpus is ever held.
+    """
+    if dtype not in EMBEDDING_DTYPES:
+        raise ValueError(f"dtype must be one of {EMBEDDING_DTYPES}, got {dtype!r}")
+    if dtype == "int8" and not normalize:
+        raise ValueError("int8 quantisation requires normalised embeddings")
+
+    model = get_model()
+    embeddings = np.empty((len(texts), model.get_sentence_embedding_dimension()), dtype=dtype)
+    sort_window = sort_window or batch_size * 16
+
+    for window_start in range(0, len(texts), sort_window):
+        window = range(window_start, min(window_start + sort_window, len(texts)))
+        order = sorted(window, key=lambda i: len(texts[i]), reverse=True)
+        for batch_start in range(0, len(order), batch_size):
+            rows = order[batch_start:batch_start + batch_size]
+            vectors = model.encode(
+                [texts[i] for i in rows],
+                batch_size=len(rows),
+                convert_to_numpy=True,
+                normalize_embeddings=normalize,
+            )
+            embeddings[rows] = quantize(vectors, dtype)
+    return embeddings
+
+def embed_chunks(chunks, batch_size=64, dtype="float32", normalize=True):
+    """Return an (n, dim) matrix with one row per chunk, in chunk order."""
+    return embed_texts([chunk["text"] for chunk in chunks], batch_size=batch_size, dtype=dtype, normalize=normalize)
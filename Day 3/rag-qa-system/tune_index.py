@@ -0,0 +1,42 @@
+import argparse
+
+from src.ann import INDEX_TYPES, tune_index
+from src.retriever import build_faiss_index
+from src.shards import store_dir_for
+from src.store import dequantize, open_vector_store, save_vector_store
+
+STORE_DIR = "vector_store"
+
+
+def tune(store_dir=STORE_DIR, target_recall=0.95, k=10, num_queries=200, index_types=INDEX_TYPES):
+    store = open_vector_store(store_dir)
+    embeddings = dequantize(store.embeddings)
+    print(f"Tuning over {len(embeddings)} vectors for recall@{k} >= {target_recall}.")
+
+    best, trials = tune_index(embeddings, target_recall=target_recall, k=k,
+                              num_queries=num_queries, index_types=index_types)
+    for trial in trials:
+        marker = "*" if trial is best else " "
+        print(f"{marker} {trial['type']:<9} {str(trial['search']):<18} "
+              f"recall={trial['recall']:.3f} latency={trial['latency_ms']:.3f} ms/query")
+
+    # The store is rewritten as a new generation with the chosen index; running apps hot-reload it
+    index_config = {key: best[key] for key in ("type", "build", "search")}
+    index_config.update(recall=best["recall"], target_recall=target_recall, k=k)
+    index = build_faiss_index(embeddings, best["type"], **best["build"])
+    meta = save_vector_store(store_dir, index, store.embeddings, store.chunks, dtype=store.meta["dtype"],
+                             sparse_index=store.sparse, index_config=index_config)
+    print(f"Saved {best['type']} index {best['search']} as generation {meta['generation']}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pick the cheapest FAISS index meeting a recall target.")
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--shard", help="Use this shard of a sharded store (vector_store/shards/<name>).")
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--num-queries", type=int, default=200)
+    parser.add_argument("--index-types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    args = parser.parse_args()
+
+    tune(store_dir_for(args.store_dir, args.shard), args.target_recall, args.k, args.num_queries, args.index_types)
@@ -5,11 +5,23 @@ import google.generativeai as genai
 from dotenv import load_dotenv
 import os
 from policy_data import policies, add_ons
+from policy_engine import PolicyEngine
+from recommendations import (
+    TABLE_PATH, RecommendationTable, build_prompt, class_key, data_fingerprint, format_recommendation,
+)
 
 load_dotenv()
 genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
 
 model = genai.GenerativeModel("gemini-2.0-flash")
+engine = PolicyEngine(policies, add_ons)
+
+@st.cache_resource
+def load_table(fingerprint):
+    # Keyed on the data fingerprint, so editing policy_data loads (and rebuilds) a fresh table
+    return RecommendationTable(TABLE_PATH, fingerprint)
+
+table = load_table(data_fingerprint(policies, add_ons))
 
 st.set_page_config(page_title="Healthcare Policy Advisor", page_icon="🏥", layout="centered")
 st.title("🏥 Healthcare Policy Advisor")
@@ -25,35 +37,19 @@ with st.form("policy_form"):
     )
     submit = st.form_submit_button("Get Recommendation")
 
-def build_prompt(age, coverage_type, dependents, needs):
-    needs_text = ", ".join(needs) if needs else "none"
-    return f"""
-You are a healthcare insurance advisor.
-
-Based on the following user input, recommend the best policy from HealthSecure Insurance Ltd:
-
-- Age: {age}
-- Coverage Type: {coverage_type}
-- Dependents: {dependents}
-- Special Requirements: {needs_text}
-
-Match policies using:
-- age eligibility
-- family type
-- special features (like maternity, dental, travel, etc.)
-
-Also suggest add-ons only if not already included in the chosen plan.
-
-Give the output in the following format:
-• Recommended Plan: [Name]
-• Why this fits: [Explanation]
-• Monthly Premium: [$]
-• Suggested Add-Ons (if any): [List or None]
-"""
-
 if submit:
-    with st.spinner("Consulting HealthSecure policies..."):
-        prompt = build_prompt(age, coverage_type, dependents, needs)
-        response = model.generate_content(prompt)
+    # Plan matching is done locally; Gemini only writes the explanation, once per input class
+    recommendation = engine.recommend(age, coverage_type, dependents, needs)
+    best = recommendation["best"]
+    if best is None:
+        st.warning("No HealthSecure plan is available for this age and coverage type.")
+    else:
+        key = class_key(recommendation)
+        explanation = table.get(key)
+        if explanation is None:
+            with st.spinner("Consulting HealthSecure policies..."):
+                explanation = model.generate_content(build_prompt(recommendation)).text.strip()
+            table.add(key, explanation)
+            table.save()
         st.success("✅ Here is your personalized recommendation:")
-        st.markdown(response.text)
+        st.markdown(format_recommendation(best, explanation))
@@ -39,16 +39,19 @@ add_ons = {
     "dental": {
         "name": "Dental & Vision Add-On",
         "cost": 50,
+        "covers": ["dental", "vision"],
         "available_in": ["Basic Health Plan", "Family Health Plus Plan", "Comprehensive Health & Wellness Plan"],
     },
     "maternity": {
         "name": "Maternity & Newborn Care Add-On",
         "cost": 75,
+        "covers": ["maternity"],
         "available_in": ["Family Health Plus Plan", "Comprehensive Health & Wellness Plan"],
     },
     "travel": {
         "name": "International Travel Medical Insurance",
         "cost": 40,
+        "covers": ["travel"],
         "available_in": ["Basic Health Plan", "Family Health Plus Plan", "Comprehensive Health & Wellness Plan", "Senior Health Security Plan"],
     }
 }
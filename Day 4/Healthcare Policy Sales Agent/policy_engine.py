@@ -0,0 +1,106 @@
+# policy_engine.py
+
+from bisect import bisect_right
+
+NEEDS = ["dental", "vision", "maternity", "mental health", "wellness", "travel"]
+NEED_BITS = {need: 1 << i for i, need in enumerate(NEEDS)}
+
+
+def needs_mask(needs):
+    mask = 0
+    for need in needs:
+        mask |= NEED_BITS[need]
+    return mask
+
+
+def mask_needs(mask):
+    return [need for need in NEEDS if mask & NEED_BITS[need]]
+
+
+class AgeIndex:
+    """Interval index over policy age ranges (inclusive at both ends).
+
+    The age axis is cut at every range boundary into segments, and each segment
+    stores a bitmask of the policies that cover it, so a lookup is one bisect.
+    """
+
+    def __init__(self, ranges):
+        self.bounds = sorted({lo for lo, _ in ranges} | {hi + 1 for _, hi in ranges})
+        self.segments = []
+        for start in self.bounds:
+            mask = 0
+            for i, (lo, hi) in enumerate(ranges):
+                if lo <= start <= hi:
+                    mask |= 1 << i
+            self.segments.append(mask)
+
+    def lookup(self, age):
+        position = bisect_right(self.bounds, age) - 1
+        return self.segments[position] if position >= 0 else 0
+
+
+class PolicyEngine:
+    """Deterministic plan matching over `policy_data.policies` and `add_ons`."""
+
+    def __init__(self, policies, add_ons):
+        self.policies = policies
+        self.add_ons = add_ons
+        self.age_index = AgeIndex([policy["age_range"] for policy in policies])
+        self.type_masks = {"individual": 0, "family": 0}
+        for i, policy in enumerate(policies):
+            for coverage_type in self.type_masks:
+                if policy["type"] in (coverage_type, "both"):
+                    self.type_masks[coverage_type] |= 1 << i
+        self.feature_masks = [needs_mask(policy["special_features"]) for policy in policies]
+        # Per plan: (mask of needs covered, add-on) for every add-on available with that plan
+        self.plan_add_ons = [
+            [
+                (needs_mask(add_on.get("covers", [need])), add_on)
+                for need, add_on in add_ons.items() if policy["name"] in add_on["available_in"]
+            ]
+            for policy in policies
+        ]
+
+    def eligible(self, age, coverage_type):
+        """Bitmask of plans open to this age and coverage type."""
+        return self.age_index.lookup(age) & self.type_masks[coverage_type]
+
+    def candidate(self, i, wanted):
+        policy = self.policies[i]
+        included = self.feature_masks[i] & wanted
+        missing = wanted & ~included
+        add_ons = []
+        covered_by_add_ons = 0
+        for covers, add_on in self.plan_add_ons[i]:
+            # Each add-on is suggested once, however many missing needs it covers
+            if missing & covers & ~covered_by_add_ons:
+                add_ons.append(add_on)
+                covered_by_add_ons |= covers
+        return {
+            "plan": policy,
+            "included": mask_needs(included),
+            "add_ons": add_ons,
+            "unmet": mask_needs(missing & ~covered_by_add_ons),
+            "monthly_total": policy["premium"] + sum(add_on["cost"] for add_on in add_ons),
+        }
+
+    def recommend(self, age, coverage_type, dependents, needs):
+        """Eligible plans ranked best first: fewest unmet needs, then lowest monthly total.
+
+        Returns {"best": candidate or None, "candidates": [...]}; each candidate has the
+        plan, the needs it already includes, the add-ons to suggest, any needs left
+        unmet and the monthly total.
+        """
+        wanted = needs_mask(needs)
+        mask = self.eligible(age, coverage_type)
+        candidates = [self.candidate(i, wanted) for i in range(len(self.policies)) if mask >> i & 1]
+        # Stable sort, so ties keep policy_data order
+        candidates.sort(key=lambda candidate: (len(candidate["unmet"]), candidate["monthly_total"]))
+        return {
+            "age": age,
+            "coverage_type": coverage_type,
+            "dependents": dependents,
+            "needs": list(needs),
+            "best": candidates[0] if candidates else None,
+            "candidates": candidates,
+        }
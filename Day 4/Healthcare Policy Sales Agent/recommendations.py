@@ -0,0 +1,161 @@
+# recommendations.py
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from policy_engine import NEEDS, mask_needs, needs_mask
+
+TABLE_PATH = os.getenv("RECOMMENDATIONS_PATH", "recommendations.json")
+COVERAGE_TYPES = ["individual", "family"]
+MAX_AGE = 120
+# Bump when policy_engine's matching rules or build_prompt change so stored explanations are regenerated
+RULES_VERSION = "2"
+
+
+def data_fingerprint(policies, add_ons):
+    """Changes whenever a policy, an add-on or RULES_VERSION changes, which invalidates every stored recommendation."""
+    data = json.dumps([RULES_VERSION, policies, add_ons], sort_keys=True, default=list)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def class_key(recommendation):
+    """Inputs with the same key get the same plan, add-ons and explanation.
+
+    Age only matters through which plans it makes eligible, and the explanation only
+    says whether there are dependents, so both collapse into a handful of classes.
+    """
+    best = recommendation["best"]
+    if best is None:
+        return None
+    dependents = "dependents" if recommendation["dependents"] else "no-dependents"
+    return f'{best["plan"]["name"]}|{recommendation["coverage_type"]}|{dependents}|{needs_mask(recommendation["needs"])}'
+
+
+def build_prompt(recommendation):
+    best = recommendation["best"]
+    plan = best["plan"]
+    low, high = plan["age_range"]
+    needs_text = ", ".join(recommendation["needs"]) if recommendation["needs"] else "none"
+    add_ons_text = ", ".join(f"{a['name']} (${a['cost']}/month)" for a in best["add_ons"]) or "none"
+    return f"""
+You are a healthcare insurance advisor for HealthSecure Insurance Ltd.
+
+The plan below has already been selected for this customer. In 2-4 sentences, explain why it fits them.
+Do not recommend a different plan and do not change any prices.
+
+Customer:
+- Age: between {low} and {high}
+- Coverage Type: {recommendation["coverage_type"]}
+- Dependents: {"yes" if recommendation["dependents"] else "none"}
+- Special Requirements: {needs_text}
+
+Selected plan: {plan["name"]} (${plan["premium"]}/month)
+- Coverage: {plan["coverage"]}
+- Requirements already included: {", ".join(best["included"]) or "none"}
+- Add-ons for the remaining requirements: {add_ons_text}
+- Requirements this plan and its add-ons do not cover: {", ".join(best["unmet"]) or "none"}
+"""
+
+
+def format_recommendation(best, explanation):
+    add_ons_text = ", ".join(f"{a['name']} (+${a['cost']}/month)" for a in best["add_ons"]) or "None"
+    return f"""
+- **Recommended Plan:** {best["plan"]["name"]}
+- **Why this fits:** {explanation}
+- **Monthly Premium:** ${best["plan"]["premium"]} (${best["monthly_total"]} with add-ons)
+- **Suggested Add-Ons (if any):** {add_ons_text}
+"""
+
+
+def enumerate_classes(engine):
+    """One representative recommendation per class over the whole input space."""
+    classes = {}
+    for age in range(MAX_AGE + 1):
+        for coverage_type in COVERAGE_TYPES:
+            for dependents in (0, 1):
+                for mask in range(1 << len(NEEDS)):
+                    recommendation = engine.recommend(age, coverage_type, dependents, mask_needs(mask))
+                    key = class_key(recommendation)
+                    if key is not None and key not in classes:
+                        classes[key] = recommendation
+    return classes
+
+
+class RecommendationTable:
+    """Explanations keyed by input class, stored as JSON next to the app.
+
+    The file records the fingerprint of the policy data and rules it was built
+    from; a table built from different ones is ignored on load.
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            if data.get("fingerprint") == fingerprint:
+                self.entries = data["entries"]
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def add(self, key, explanation):
+        with self._lock:
+            self.entries[key] = explanation
+
+    def save(self):
+        with self._lock:
+            data = {"fingerprint": self.fingerprint, "entries": dict(self.entries)}
+        # A unique temp file per save, so concurrent sessions never rename each other's file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f, indent=0, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+
+def warm(table, engine, explain, workers=4):
+    """Generate explanations for every class missing from `table`; returns how many were added."""
+    missing = {key: rec for key, rec in enumerate_classes(engine).items() if table.get(key) is None}
+
+    def generate(item):
+        key, recommendation = item
+        table.add(key, explain(build_prompt(recommendation)))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(generate, missing.items()))
+    table.save()
+    return len(missing)
+
+
+if __name__ == "__main__":
+    import google.generativeai as genai
+    from dotenv import load_dotenv
+
+    from policy_data import policies, add_ons
+    from policy_engine import PolicyEngine
+
+    parser = argparse.ArgumentParser(description="Precompute policy recommendations for every input class.")
+    parser.add_argument("--path", default=TABLE_PATH)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    load_dotenv()
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    model = genai.GenerativeModel("gemini-2.0-flash")
+
+    engine = PolicyEngine(policies, add_ons)
+    table = RecommendationTable(args.path, data_fingerprint(policies, add_ons))
+    added = warm(table, engine, lambda prompt: model.generate_content(prompt).text.strip(), args.workers)
+    print(f"Added {added} recommendations; table has {len(table.entries)}.")
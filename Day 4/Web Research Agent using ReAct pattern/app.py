@@ -1,14 +1,15 @@
 import streamlit as st
 import google.generativeai as genai
 from tavily import TavilyClient
-import tempfile
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-import re
 import os
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dotenv import load_dotenv
+from utils.compression import compress_evidence
+from utils.pdf_renderer import PdfCache, clean_markdown_for_pdf
+from utils.search_cache import SearchCache
 
 # ------------ LOAD API KEYS FROM .env ------------
 load_dotenv()
@@ -24,42 +25,190 @@ if not GEMINI_API_KEY or not TAVILY_API_KEY:
 genai.configure(api_key=GEMINI_API_KEY)
 tavily_client = TavilyClient(api_key=TAVILY_API_KEY)
 
+# ------------ CONCURRENCY SETTINGS ------------
+MAX_WORKERS = int(os.getenv("RESEARCH_MAX_WORKERS", "6"))
+QUESTION_TIMEOUT = float(os.getenv("RESEARCH_QUESTION_TIMEOUT", "60"))
+TOKEN_BUDGET = int(os.getenv("RESEARCH_TOKEN_BUDGET", "1500"))
+NO_CONTENT_MESSAGE = "⚠️ Could not retrieve sufficient data from the web to summarize this question."
+
+
+class RateLimiter:
+    """Spaces calls to one provider out to at most `rate` per second, across threads (no limit when falsy)."""
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+@st.cache_resource
+def get_providers(tavily_rate, gemini_rate):
+    # Built once per process, so the rate limits hold across Streamlit reruns and sessions
+    return RateLimiter(tavily_rate), RateLimiter(gemini_rate), genai.GenerativeModel("gemini-2.0-flash")
+
+
+tavily_limiter, gemini_limiter, gemini_model = get_providers(
+    float(os.getenv("TAVILY_RATE_LIMIT", "0")), float(os.getenv("GEMINI_RATE_LIMIT", "0"))
+)
+
+# ------------ SEARCH CACHE ------------
+@st.cache_resource
+def get_search_cache(path, ttl):
+    # One connection per process: reruns reuse it instead of reopening it and re-running the expiry sweep
+    return SearchCache(path, ttl=ttl)
+
+
+search_cache = get_search_cache(
+    os.getenv("SEARCH_CACHE_PATH", ".cache/search_cache.sqlite3"),
+    float(os.getenv("SEARCH_CACHE_TTL", str(24 * 60 * 60))),
+)
+
+# ------------ PDF CACHE ------------
+pdf_cache = PdfCache(
+    os.getenv("PDF_CACHE_DIR", ".cache/pdf"),
+    max_bytes=int(float(os.getenv("PDF_CACHE_MAX_MB", "100")) * 1024 * 1024),
+)
+
 # ------------ AGENT CLASS ------------
 class WebResearchAgent:
     def __init__(self, topic):
         self.topic = topic
         self.questions = []
         self.key_points = {}
+        self.compression_stats = {}
 
     def generate_questions(self):
+        for _ in self.stream_questions():
+            pass
+
+    def stream_questions(self):
+        """Stream the question list from Gemini, yielding each question as soon as its line is complete."""
         prompt = f"""
         Generate 6 well-structured research questions about the topic "{self.topic}".
         Cover background, challenges, opportunities, technology, policy, and future trends.
         """
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        response = model.generate_content(prompt)
-        lines = response.text.strip().split("\n")
+        gemini_limiter.acquire()
+        response = gemini_model.generate_content(prompt, stream=True)
 
-        for line in lines:
-            if line.strip():
-                question = line.strip("-•1234567890. ").strip()
-                self.questions.append(question)
+        pending = ""
+        for chunk in response:
+            pending += chunk.text
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                question = self._parse_question(line)
+                if question:
+                    yield question
+        question = self._parse_question(pending)
+        if question:
+            yield question
+
+    def _parse_question(self, line):
+        if line.strip():
+            question = line.strip("-•1234567890. ").strip()
+            self.questions.append(question)
+            return question
+        return None
 
     def search_web_and_extract_key_points(self, question):
-        safe_query = question.strip()[:400]
-        response = tavily_client.search(query=safe_query, max_results=5)
-        combined_content = ""
-        for result in response.get("results", []):
-            content = result.get("content", "")
-            if content:
-                combined_content += content + "\n"
+        self.key_points[question] = self._research_question(question)
+
+    def research_all(self, questions=None, max_workers=MAX_WORKERS, timeout=QUESTION_TIMEOUT):
+        """Research every question at once on a bounded thread pool.
+
+        `questions` may be a live iterator such as `stream_questions()`: each question is
+        dispatched the moment it arrives, so searching overlaps with question generation.
+        Results are stored in question order; a question that fails or runs past
+        `timeout` gets a warning in its section instead of failing the report.
+        """
+        for question, result, error in self._run_parallel(self._research_question, questions, max_workers, timeout):
+            self.key_points[question] = error or result
+
+    def research_batched(self, questions=None, max_workers=MAX_WORKERS, timeout=QUESTION_TIMEOUT):
+        """Like `research_all`, but summarises every question in a single Gemini call.
+
+        Evidence is gathered in parallel as questions arrive, then sent in one request
+        that answers with JSON bullets per question. Only questions whose section is
+        missing or malformed fall back to their own summarisation call.
+        """
+        evidence = {}
+        for question, content, error in self._run_parallel(self._gather_evidence, questions, max_workers, timeout):
+            if error:
+                self.key_points[question] = error
+            elif not content.strip():
+                self.key_points[question] = NO_CONTENT_MESSAGE
+            else:
+                evidence[question] = content
+        if not evidence:
+            return
+
+        try:
+            sections = self._summarize_batch(evidence, timeout)
+        except Exception:
+            sections = {}
+        self.key_points.update(sections)
+
+        retry = [question for question in evidence if question not in sections]
+        summarize = lambda question, timeout: self._summarize(question, evidence[question], timeout)
+        for question, result, error in self._run_parallel(summarize, retry, max_workers, timeout):
+            self.key_points[question] = error or result
+
+    def _run_parallel(self, work, questions, max_workers, timeout):
+        """Run `work(question, timeout)` on a bounded pool; returns (question, result, error message) in question order."""
+        pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+        submitted = []
+        for question in (self.questions if questions is None else questions):
+            submitted.append((question, pool.submit(work, question, timeout)))
+
+        # Queued questions only start once a worker frees up, so allow one timeout per wave
+        waves = max(1, -(-len(submitted) // max(1, max_workers)))
+        deadline = time.monotonic() + timeout * waves
+        results = []
+        for question, future in submitted:
+            try:
+                results.append((question, future.result(timeout=max(0.0, deadline - time.monotonic())), None))
+            except FutureTimeoutError:
+                results.append((question, None, "⚠️ Research timed out for this question."))
+            except Exception as e:
+                results.append((question, None, f"⚠️ Research failed for this question: {e}"))
+        # Don't hold the report back for a straggler; its result is simply discarded
+        pool.shutdown(wait=False, cancel_futures=True)
+        return results
+
+    def _research_question(self, question, timeout=QUESTION_TIMEOUT):
+        combined_content = self._gather_evidence(question, timeout)
 
         # If no content found, skip summarization
         if not combined_content.strip():
-            self.key_points[question] = "⚠️ Could not retrieve sufficient data from the web to summarize this question."
-            return
+            return NO_CONTENT_MESSAGE
+        return self._summarize(question, combined_content, timeout)
+
+    def _gather_evidence(self, question, timeout=QUESTION_TIMEOUT):
+        safe_query = question.strip()[:400]
+
+        def fetch(query):
+            tavily_limiter.acquire()
+            return tavily_client.search(query=query, max_results=5, timeout=timeout)
+
+        response = search_cache.search(safe_query, fetch, max_results=5)
+        contents = [result["content"] for result in response.get("results", []) if result.get("content")]
 
-        # Summarize using Gemini
+        # Drop near-duplicate sentences and keep the most relevant ones within the token budget
+        combined_content, self.compression_stats[question] = compress_evidence(
+            question, contents, token_budget=TOKEN_BUDGET
+        )
+        return combined_content
+
+    def _summarize(self, question, combined_content, timeout=QUESTION_TIMEOUT):
         summary_prompt = f"""
         Extract 5 concise bullet points from the text below that answer the following question:
 
@@ -68,14 +217,47 @@ class WebResearchAgent:
         Text:
         {combined_content}
         """
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        summary_response = model.generate_content(summary_prompt)
+        gemini_limiter.acquire()
+        summary_response = gemini_model.generate_content(summary_prompt, request_options={"timeout": timeout})
 
         # Additional fallback if Gemini returns a bad response
         if "Please provide the text" in summary_response.text:
-            self.key_points[question] = "⚠️ Gemini could not generate bullet points due to limited input content."
-        else:
-            self.key_points[question] = summary_response.text.strip()
+            return "⚠️ Gemini could not generate bullet points due to limited input content."
+        return summary_response.text.strip()
+
+    def _summarize_batch(self, evidence, timeout=QUESTION_TIMEOUT):
+        """One Gemini call for every question in `evidence`; returns bullets for the sections that validate."""
+        questions = list(evidence)
+        blocks = "\n\n".join(
+            f'Question {i}: "{question}"\nText:\n{evidence[question]}' for i, question in enumerate(questions, 1)
+        )
+        prompt = f"""
+        For each numbered question below, extract 5 concise bullet points from its text that answer it.
+        Use only the text given for that question.
+        Respond with JSON only, in the form {{"sections": [{{"question": <number>, "bullets": ["...", ...]}}]}}.
+
+        {blocks}
+        """
+        gemini_limiter.acquire()
+        response = gemini_model.generate_content(
+            prompt,
+            generation_config={"response_mime_type": "application/json"},
+            request_options={"timeout": timeout},
+        )
+
+        sections = {}
+        for section in json.loads(response.text).get("sections", []):
+            number = section.get("question") if isinstance(section, dict) else None
+            bullets = section.get("bullets") if isinstance(section, dict) else None
+            if not isinstance(number, int) or not 1 <= number <= len(questions):
+                continue
+            if not isinstance(bullets, list) or not 1 <= len(bullets) <= 10:
+                continue
+            bullets = [bullet.strip() for bullet in bullets if isinstance(bullet, str) and bullet.strip()]
+            if not bullets or any("Please provide the text" in bullet for bullet in bullets):
+                continue
+            sections[questions[number - 1]] = "\n".join(f"- {bullet}" for bullet in bullets)
+        return sections
 
     def compile_report(self):
         report = f"# Research Report on: {self.topic}\n\n"
@@ -89,81 +271,12 @@ class WebResearchAgent:
         return report
 
     def create_pdf(self, report_md):
-        """Create PDF using ReportLab"""
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-            doc = SimpleDocTemplate(tmp_pdf.name, pagesize=letter)
-            styles = getSampleStyleSheet()
-            
-            # Custom styles
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=16,
-                spaceAfter=20,
-                alignment=1  # Center alignment
-            )
-            
-            heading_style = ParagraphStyle(
-                'CustomHeading',
-                parent=styles['Heading2'],
-                fontSize=12,
-                spaceBefore=12,
-                spaceAfter=6
-            )
-            
-            story = []
-            
-            # Split markdown into sections
-            sections = report_md.split('\n')
-            
-            for section in sections:
-                section = section.strip()
-                if not section:
-                    continue
-                    
-                if section.startswith('# '):
-                    # Main title
-                    title_text = section[2:]
-                    story.append(Paragraph(title_text, title_style))
-                    story.append(Spacer(1, 12))
-                    
-                elif section.startswith('## '):
-                    # Section heading
-                    heading_text = section[3:]
-                    story.append(Paragraph(heading_text, heading_style))
-                    story.append(Spacer(1, 6))
-                    
-                else:
-                    # Regular text - clean up markdown formatting properly
-                    text = self.clean_markdown_for_pdf(section)
-                    if text:  # Only add non-empty paragraphs
-                        story.append(Paragraph(text, styles['Normal']))
-                        story.append(Spacer(1, 6))
-            
-            doc.build(story)
-            return tmp_pdf.name
-    
+        """Create PDF using ReportLab, or reuse the cached render of the same report"""
+        return pdf_cache.get_or_render(report_md)
+
     def clean_markdown_for_pdf(self, text):
         """Clean markdown formatting for PDF generation"""
-        # Remove or escape problematic characters
-        text = text.replace('<', '&lt;').replace('>', '&gt;')
-        
-        # Handle bold text properly - find **text** patterns
-        import re
-        
-        # Replace **text** with <b>text</b>
-        text = re.sub(r'\*\*([^*]+)\*\*', r'<b>\1</b>', text)
-        
-        # Replace *text* with <i>text</i>
-        text = re.sub(r'\*([^*]+)\*', r'<i>\1</i>', text)
-        
-        # Clean up bullet points
-        text = re.sub(r'^[-•]\s*', '• ', text)
-        
-        # Remove empty lines and extra spaces
-        text = text.strip()
-        
-        return text
+        return clean_markdown_for_pdf(text)
 
 # ------------ STREAMLIT UI ------------
 st.set_page_config(page_title="Web Research Agent", layout="wide")
@@ -172,18 +285,36 @@ st.title("🧠 Web Research Agent using Gemini + Tavily")
 st.markdown("This tool generates structured research reports using AI and real-time web search.")
 
 topic = st.text_input("Enter a research topic:", "")
+parallel = st.checkbox("Research questions in parallel", value=True)
+batched = st.checkbox("Summarise all questions in one Gemini call", value=True, disabled=not parallel)
 
 if st.button("Run Research Agent") and topic:
     with st.spinner("Running the agent... this may take a minute."):
         agent = WebResearchAgent(topic)
-        agent.generate_questions()
+        if parallel and batched:
+            agent.research_batched(agent.stream_questions())
+        elif parallel:
+            # Each question is searched as soon as Gemini finishes writing it
+            agent.research_all(agent.stream_questions())
+        else:
+            agent.generate_questions()
+            for question in agent.questions:
+                agent.search_web_and_extract_key_points(question)
 
-        for question in agent.questions:
-            agent.search_web_and_extract_key_points(question)
+        # Kept in the session so download clicks (which rerun the script) still show the report
+        st.session_state.report_md = agent.compile_report()
+        st.session_state.tokens = (
+            sum(stats["tokens_in"] for stats in agent.compression_stats.values()),
+            sum(stats["tokens_out"] for stats in agent.compression_stats.values()),
+        )
 
-        report_md = agent.compile_report()
+if "report_md" in st.session_state:
+    report_md = st.session_state.report_md
+    tokens_in, tokens_out = st.session_state.tokens
 
     st.success("✅ Research complete!")
+    if tokens_in:
+        st.caption(f"Evidence sent to Gemini: {tokens_out:,} of {tokens_in:,} tokens retrieved.")
     st.markdown(report_md)
 
     # Markdown download
@@ -194,9 +325,9 @@ if st.button("Run Research Agent") and topic:
         mime="text/markdown"
     )
 
-    # PDF download using ReportLab
+    # PDF download using ReportLab, rendered once per report
     try:
-        pdf_file_path = agent.create_pdf(report_md)
+        pdf_file_path = pdf_cache.get_or_render(report_md)
         with open(pdf_file_path, "rb") as f:
             st.download_button(
                 label="📥 Download Report as PDF",
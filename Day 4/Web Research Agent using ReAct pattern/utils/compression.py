@@ -0,0 +1,128 @@
+import math
+import re
+import zlib
+from collections import Counter
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+TOKEN = re.compile(r"\w+|[^\w\s]")
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "how", "in", "is",
+    "it", "its", "of", "on", "or", "that", "the", "this", "to", "what", "which", "who", "why", "will", "with",
+}
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+PRIME = (1 << 61) - 1
+# Fixed coefficients keep signatures stable across runs
+PERMUTATIONS = [((i + 1) * 0x9E3779B1 % PRIME, (i + 7) * 0x85EBCA77 % PRIME) for i in range(NUM_PERM)]
+
+
+def count_tokens(text):
+    """Local token estimate: words and punctuation marks, close to what an LLM tokenizer counts."""
+    return len(TOKEN.findall(text))
+
+
+def split_sentences(text):
+    return [sentence.strip() for sentence in SENTENCE_SPLIT.split(text) if sentence.strip()]
+
+
+def _words(text):
+    return WORD.findall(text.lower())
+
+
+def _shingles(words, size=3):
+    if len(words) <= size:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(shingles):
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+    return tuple(min((a * h + b) % PRIME for h in hashes) for a, b in PERMUTATIONS)
+
+
+def _similarity(sig_a, sig_b):
+    return sum(x == y for x, y in zip(sig_a, sig_b)) / NUM_PERM
+
+
+def dedupe_sentences(sentences, threshold=0.8):
+    """Indices of sentences to keep: the first of every group of near-duplicates.
+
+    MinHash signatures over word 3-shingles estimate Jaccard similarity; LSH banding
+    means each sentence is only compared with the few that share a band bucket.
+    """
+    keep = []
+    signatures = []
+    buckets = {}
+    for i, sentence in enumerate(sentences):
+        words = _words(sentence)
+        if not words:
+            continue
+        signature = minhash(_shingles(words))
+        bands = [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+        candidates = {j for key in bands for j in buckets.get(key, ())}
+        if any(_similarity(signature, signatures[j]) >= threshold for j in candidates):
+            continue
+        for key in bands:
+            buckets.setdefault(key, []).append(len(signatures))
+        signatures.append(signature)
+        keep.append(i)
+    return keep
+
+
+def rank_sentences(question, sentences):
+    """Score sentences by TF-IDF overlap with the question's content words."""
+    terms = {word for word in _words(question) if word not in STOPWORDS}
+    tokenized = [Counter(_words(sentence)) for sentence in sentences]
+    document_frequency = Counter(term for counts in tokenized for term in terms if term in counts)
+    total = len(sentences)
+    scores = []
+    for counts in tokenized:
+        length = sum(counts.values()) or 1
+        score = sum(
+            (1 + math.log(counts[term])) * math.log(1 + total / document_frequency[term])
+            for term in terms if counts[term]
+        )
+        # Normalise by length so long run-on sentences don't win on word count alone
+        scores.append(score / math.sqrt(length))
+    return scores
+
+
+def compress_evidence(question, contents, token_budget=1500, min_words=4):
+    """Deduplicated, question-ranked extract of `contents` that fits in `token_budget` tokens.
+
+    Returns (text, stats). Selected sentences keep their original order, one source per paragraph.
+    """
+    sentences, sources = [], []
+    for source, content in enumerate(contents):
+        for sentence in split_sentences(content):
+            if len(sentence.split()) >= min_words:
+                sentences.append(sentence)
+                sources.append(source)
+
+    kept = dedupe_sentences(sentences)
+    scores = rank_sentences(question, [sentences[i] for i in kept])
+
+    selected, used = [], 0
+    for score, i in sorted(zip(scores, kept), key=lambda pair: (-pair[0], pair[1])):
+        tokens = count_tokens(sentences[i])
+        if used + tokens > token_budget:
+            continue
+        selected.append(i)
+        used += tokens
+
+    paragraphs = {}
+    for i in sorted(selected):
+        paragraphs.setdefault(sources[i], []).append(sentences[i])
+    text = "\n".join(" ".join(paragraph) for paragraph in paragraphs.values())
+
+    stats = {
+        "sentences": len(sentences),
+        "duplicates": len(sentences) - len(kept),
+        "selected": len(selected),
+        "tokens_in": sum(count_tokens(content) for content in contents),
+        "tokens_out": used,
+    }
+    return text, stats
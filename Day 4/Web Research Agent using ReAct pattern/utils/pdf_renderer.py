@@ -0,0 +1,152 @@
+import hashlib
+import os
+import re
+import tempfile
+from functools import lru_cache
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+
+# Bump when the rendering changes so cached PDFs of the same report are not reused
+RENDERER_VERSION = "1"
+
+BOLD = re.compile(r'\*\*([^*]+)\*\*')
+ITALIC = re.compile(r'\*([^*]+)\*')
+BULLET = re.compile(r'^[-•]\s*')
+
+
+@lru_cache(maxsize=1)
+def get_styles():
+    styles = getSampleStyleSheet()
+    return {
+        "title": ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            spaceAfter=20,
+            alignment=1  # Center alignment
+        ),
+        "heading": ParagraphStyle(
+            'CustomHeading',
+            parent=styles['Heading2'],
+            fontSize=12,
+            spaceBefore=12,
+            spaceAfter=6
+        ),
+        "normal": styles['Normal'],
+    }
+
+
+def clean_markdown_for_pdf(text):
+    """Clean markdown formatting for PDF generation"""
+    # Remove or escape problematic characters
+    text = text.replace('<', '&lt;').replace('>', '&gt;')
+    # Replace **text** with <b>text</b>, then *text* with <i>text</i>
+    text = BOLD.sub(r'<b>\1</b>', text)
+    text = ITALIC.sub(r'<i>\1</i>', text)
+    # Clean up bullet points
+    text = BULLET.sub('• ', text)
+    return text.strip()
+
+
+def iter_flowables(report_md):
+    """Flowables for the report, produced one Markdown line at a time."""
+    styles = get_styles()
+    for match in re.finditer(r'[^\n]+', report_md):
+        line = match.group().strip()
+        if not line:
+            continue
+        if line.startswith('# '):
+            yield Paragraph(line[2:], styles["title"])
+            yield Spacer(1, 12)
+        elif line.startswith('## '):
+            yield Paragraph(line[3:], styles["heading"])
+            yield Spacer(1, 6)
+        else:
+            text = clean_markdown_for_pdf(line)
+            if text:  # Only add non-empty paragraphs
+                yield Paragraph(text, styles["normal"])
+                yield Spacer(1, 6)
+
+
+class FlowableStream(list):
+    """A story list that ReportLab consumes from the front while it is refilled from a generator.
+
+    SimpleDocTemplate.build() only looks at the head of the list (plus a short
+    keep-with-next lookahead), so holding `window` flowables at a time is enough.
+    """
+
+    def __init__(self, flowables, window=64):
+        super().__init__()
+        self._source = iter(flowables)
+        self._window = window
+
+    def _fill(self):
+        while self._source is not None and list.__len__(self) < self._window:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+
+def render_pdf(report_md, path):
+    doc = SimpleDocTemplate(path, pagesize=letter)
+    doc.build(FlowableStream(iter_flowables(report_md)))
+
+
+class PdfCache:
+    """Rendered reports keyed by content hash, in a directory kept under `max_bytes` (least recently used first out)."""
+
+    def __init__(self, directory, max_bytes=100 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, report_md):
+        digest = hashlib.sha256(f"{RENDERER_VERSION}\n{report_md}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pdf")
+
+    def get_or_render(self, report_md):
+        path = self.path_for(report_md)
+        if os.path.exists(path):
+            os.utime(path)  # Mark as recently used
+            return path
+
+        # Render next to the final path and rename, so a half-written PDF is never served
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            render_pdf(report_md, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pdf"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_TTL = 24 * 60 * 60
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|ref)$")
+
+
+def normalize_query(query):
+    """Case, whitespace and trailing punctuation don't change what a search returns."""
+    return " ".join(query.lower().split()).rstrip("?.! ")
+
+
+def normalize_url(url):
+    parts = urlsplit(url.strip())
+    query = urlencode([(k, v) for k, v in parse_qsl(parts.query) if not TRACKING_PARAMS.match(k)])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), query, ""))
+
+
+def content_key(text):
+    return hashlib.sha1(" ".join(text.lower().split()).encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """On-disk cache of web searches, plus a URL -> content store shared by all queries.
+
+    A search is stored as its list of result URLs; the page text lives once in the
+    URL store, so a page returned for several questions is stored (and later sent
+    to the model) only once. Entries older than `ttl` seconds are refetched.
+    """
+
+    def __init__(self, path, ttl=DEFAULT_TTL):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS searches (query TEXT PRIMARY KEY, results TEXT, created REAL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS pages (url TEXT PRIMARY KEY, title TEXT, content TEXT, fetched REAL)")
+            expired = time.time() - ttl
+            self._db.execute("DELETE FROM searches WHERE created < ?", (expired,))
+            self._db.execute("DELETE FROM pages WHERE fetched < ?", (expired,))
+        self.hits = 0
+        self.misses = 0
+
+    def search(self, query, fetch, max_results=5):
+        """Results for `query` as a Tavily-style {"results": [...]} dict.
+
+        `fetch(query)` is only called on a miss, so rate limiting belongs inside it.
+        Duplicate pages and identical snippets are dropped from the results.
+        """
+        key = f"{normalize_query(query)}|{max_results}"
+        with self._lock:
+            row = self._db.execute(
+                "SELECT results FROM searches WHERE query = ? AND created >= ?", (key, time.time() - self.ttl)
+            ).fetchone()
+        if row is not None:
+            self.hits += 1
+            return {"results": self._load_pages(json.loads(row[0]))}
+
+        self.misses += 1
+        response = fetch(query)
+        urls = []
+        now = time.time()
+        with self._lock, self._db:
+            for result in response.get("results", []):
+                url = normalize_url(result.get("url", ""))
+                content = result.get("content") or ""
+                if not url or not content:
+                    continue
+                # Keep the fullest text seen for a page, whichever query fetched it
+                self._db.execute(
+                    "INSERT INTO pages (url, title, content, fetched) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(url) DO UPDATE SET fetched = excluded.fetched, "
+                    "content = CASE WHEN length(excluded.content) > length(content) THEN excluded.content ELSE content END",
+                    (url, result.get("title", ""), content, now),
+                )
+                urls.append(url)
+            self._db.execute(
+                "INSERT OR REPLACE INTO searches (query, results, created) VALUES (?, ?, ?)", (key, json.dumps(urls), now)
+            )
+        return {"results": self._load_pages(urls)}
+
+    def _load_pages(self, urls):
+        results = []
+        seen_urls, seen_content = set(), set()
+        with self._lock:
+            for url in urls:
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+                row = self._db.execute("SELECT title, content FROM pages WHERE url = ?", (url,)).fetchone()
+                if row is None:
+                    continue
+                digest = content_key(row[1])
+                if digest in seen_content:
+                    continue
+                seen_content.add(digest)
+                results.append({"url": url, "title": row[0], "content": row[1]})
+        return results
+
+    def stats(self):
+        with self._lock:
+            searches = self._db.execute("SELECT COUNT(*) FROM searches").fetchone()[0]
+            pages = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "searches": searches, "pages": pages}
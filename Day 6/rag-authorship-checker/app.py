@@ -1,10 +1,12 @@
 import streamlit as st
 import tempfile
 from utils.metadata import extract_metadata_and_text, split_sections,clean_section_titles
-from utils.citation import get_citation_count
-from utils.gemini_analysis import analyze_section_with_gemini
-from utils.rag_similarity import fetch_similar_papers, reconstruct_openalex_abstract, generate_comparison
+from utils.pipeline import run_checks
 import pandas as pd
+import os
+
+MAX_WORKERS = int(os.getenv("CHECKER_MAX_WORKERS", "8"))
+CALL_TIMEOUT = float(os.getenv("CHECKER_CALL_TIMEOUT", "30"))
 
 st.set_page_config(page_title="📄 Research Paper Authorship Checker", layout="wide")
 st.title("📄 Research Paper Authorship Checker with RAG Similarity")
@@ -24,40 +26,47 @@ if uploaded_file:
     col1.markdown(f"**📄 Title:** {data['title']}")
     col2.markdown(f"**✍️ Authors:** {data['authors']}")
 
-    with st.spinner("📈 Fetching citation count..."):
-        count = get_citation_count(data["title"])
-    st.markdown(f"**📊 Citation Count:** `{count}`")
+    sections = clean_section_titles(split_sections(data["full_text"]))
+
+    citation_slot = st.empty()
+    citation_slot.markdown("**📊 Citation Count:** ⏳ fetching...")
 
     st.subheader("📚 Section-wise AI Authorship Verdict")
-    with st.spinner("📖 Analyzing sections with Gemini..."):
-        sections = split_sections(data["full_text"])
-        sections = clean_section_titles(sections)
-
-        if not sections:
-            st.warning("⚠️ No clear section headings found.")
-        else:
-            verdicts = []
-            for sec_title, sec_text in sections.items():
-                verdict = analyze_section_with_gemini(sec_title, sec_text)
-                short_verdict = "✅ Human-written" if "Human" in verdict else "❌ AI-generated"
-                verdicts.append({"Section": sec_title, "Verdict": short_verdict})
-
-            df = pd.DataFrame(verdicts)
-            df.index = [f"{i+1}" for i in range(len(df))]
-            st.dataframe(df.style.set_properties(**{'text-align': 'left'}), use_container_width=True, height=450)
+    verdicts = [{"Section": sec_title, "Verdict": "⏳ Analyzing..."} for sec_title in sections]
+    if not sections:
+        st.warning("⚠️ No clear section headings found.")
+    table_slot = st.empty()
+
+    def show_verdicts():
+        df = pd.DataFrame(verdicts)
+        df.index = [f"{i+1}" for i in range(len(df))]
+        table_slot.dataframe(df.style.set_properties(**{'text-align': 'left'}), use_container_width=True, height=450)
+
+    if sections:
+        show_verdicts()
 
     st.subheader("🔍 RAG-Based Abstract Similarity Check")
-    abstract = data["abstract"]
-    if not abstract:
-        st.warning("⚠️ Abstract not found for similarity comparison.")
+    similarity_slot = st.empty()
+    if not data["abstract"]:
+        similarity_slot.warning("⚠️ Abstract not found for similarity comparison.")
     else:
-        with st.spinner("🌐 Fetching similar papers from OpenAlex..."):
-            similar_papers = fetch_similar_papers(data["title"])
-            similar_abstracts = "\n\n".join([
-                reconstruct_openalex_abstract(p.get("abstract_inverted_index", {})) for p in similar_papers
-            ])
-
-        with st.spinner("🧠 Comparing with Gemini..."):
-            rag_result = generate_comparison(abstract, similar_abstracts)
-            st.markdown("### 📝 Similarity Report")
-            st.info(rag_result)
+        similarity_slot.info("🌐 Fetching similar papers from OpenAlex and comparing with Gemini...")
+
+    # OpenAlex lookups and section classification run concurrently; each result is shown as it arrives
+    with st.spinner("📖 Analyzing sections with Gemini..."):
+        for stage, key, result, error in run_checks(data, sections, max_workers=MAX_WORKERS, timeout=CALL_TIMEOUT):
+            if stage == "citations":
+                citation_slot.markdown(f"**📊 Citation Count:** `{result if error is None else 'Citation info not found'}`")
+            elif stage == "section":
+                if error is not None:
+                    verdicts[key]["Verdict"] = f"⚠️ Not analyzed ({error})"
+                else:
+                    verdicts[key]["Verdict"] = "✅ Human-written" if "Human" in result else "❌ AI-generated"
+                show_verdicts()
+            elif stage == "similarity":
+                with similarity_slot.container():
+                    st.markdown("### 📝 Similarity Report")
+                    if error is not None:
+                        st.warning(f"⚠️ Similarity check failed ({error})")
+                    else:
+                        st.info(result)
@@ -1,12 +1,12 @@
 import requests
 
-def get_citation_count(title):
+def get_citation_count(title, timeout=None):
     url = "https://api.openalex.org/works"
     params = {
         "filter": f"title.search:{title}",
         "per-page": 1
     }
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, timeout=timeout)
     if response.status_code == 200:
         data = response.json()
         return data.get("meta", {}).get("count", "Citation info not found")
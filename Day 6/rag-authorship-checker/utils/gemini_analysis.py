@@ -1,7 +1,7 @@
-import google.generativeai as genai
 import re
 import os
 from dotenv import load_dotenv
+from utils.gemini_client import generate_text
 
 # Load environment variables from .env file
 load_dotenv()
@@ -9,9 +9,7 @@ load_dotenv()
 # Read API keys from environment
 GEMINI_API_KEY1 = os.getenv("GEMINI_API_KEY1")
 
-def analyze_section_with_gemini(section_title, section_text):
-    genai.configure(api_key=GEMINI_API_KEY1)
-    model = genai.GenerativeModel("gemini-2.0-flash")
+def analyze_section_with_gemini(section_title, section_text, timeout=None):
     prompt = f"""
 You are an expert in academic writing.
 
@@ -24,5 +22,4 @@ Do not explain the reasoning. Just reply with one of the following: "Human-writt
 Section:
 {section_text[:3000]}
 """
-    response = model.generate_content(prompt)
-    return response.text.strip()
+    return generate_text(GEMINI_API_KEY1, prompt, timeout=timeout).strip()
@@ -0,0 +1,28 @@
+import threading
+
+from google.ai import generativelanguage as glm
+
+_lock = threading.Lock()
+_clients = {}
+
+def get_client(api_key):
+    """
+    Returns a cached Gemini client for api_key.
+    Each client carries its own key, unlike genai.configure() which is process-wide,
+    so clients for different keys can be used from several threads at once.
+    """
+    with _lock:
+        if api_key not in _clients:
+            _clients[api_key] = glm.GenerativeServiceClient(client_options={"api_key": api_key})
+        return _clients[api_key]
+
+def generate_text(api_key, prompt, timeout=None, model_name="gemini-2.0-flash"):
+    options = {"timeout": timeout} if timeout else {}
+    response = get_client(api_key).generate_content(
+        model=f"models/{model_name}",
+        contents=[glm.Content(role="user", parts=[glm.Part(text=prompt)])],
+        **options
+    )
+    if not response.candidates:
+        return ""
+    return "".join(part.text for part in response.candidates[0].content.parts)
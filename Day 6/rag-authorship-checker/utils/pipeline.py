@@ -0,0 +1,47 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeoutError
+
+from utils.citation import get_citation_count
+from utils.gemini_analysis import analyze_section_with_gemini
+from utils.rag_similarity import fetch_similar_papers, reconstruct_openalex_abstract, generate_comparison
+
+def _similarity(title, abstract, timeout):
+    similar_papers = fetch_similar_papers(title, timeout=timeout)
+    similar_abstracts = "\n\n".join([
+        reconstruct_openalex_abstract(p.get("abstract_inverted_index", {})) for p in similar_papers
+    ])
+    return generate_comparison(abstract, similar_abstracts, timeout=timeout)
+
+def run_checks(data, sections, max_workers=8, timeout=30):
+    """
+    Runs the citation lookup, the abstract similarity check and one classification
+    per section at the same time on a bounded thread pool.
+    Yields (stage, key, result, error) as each call finishes, where stage is
+    "citations", "similarity" or "section" (key is then the section index).
+    Every call has its own timeout; a failed or timed-out call yields an error
+    message instead of stopping the others.
+    """
+    pool = ThreadPoolExecutor(max_workers=max(1, max_workers))
+    futures = {pool.submit(get_citation_count, data["title"], timeout): ("citations", None)}
+    if data["abstract"]:
+        futures[pool.submit(_similarity, data["title"], data["abstract"], timeout)] = ("similarity", None)
+    for i, (sec_title, sec_text) in enumerate(sections.items()):
+        futures[pool.submit(analyze_section_with_gemini, sec_title, sec_text, timeout)] = ("section", i)
+
+    # Queued calls only start once a worker frees up, so allow one timeout per wave;
+    # the similarity check makes two calls back to back
+    waves = -(-len(futures) // max(1, max_workers)) + 1
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=timeout * waves):
+            pending.discard(future)
+            stage, key = futures[future]
+            try:
+                yield stage, key, future.result(), None
+            except Exception as e:
+                yield stage, key, None, str(e) or type(e).__name__
+    except FutureTimeoutError:
+        for future in pending:
+            stage, key = futures[future]
+            yield stage, key, None, "timed out"
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -1,8 +1,8 @@
 import requests
 import re
-import google.generativeai as genai
 from dotenv import load_dotenv
 import os
+from utils.gemini_client import generate_text
 
 # Load environment variables from .env file
 load_dotenv()
@@ -10,13 +10,13 @@ load_dotenv()
 # Read API keys from environment
 GEMINI_API_KEY2 = os.getenv("GEMINI_API_KEY2")
 
-def fetch_similar_papers(query, num_results=5):
+def fetch_similar_papers(query, num_results=5, timeout=None):
     url = "https://api.openalex.org/works"
     params = {
         "filter": f"title.search:{query}",
         "per-page": num_results
     }
-    response = requests.get(url, params=params)
+    response = requests.get(url, params=params, timeout=timeout)
     if response.status_code == 200:
         return response.json().get("results", [])
     return []
@@ -28,9 +28,7 @@ def reconstruct_openalex_abstract(abstract_dict):
     sorted_words = [word for index, word in sorted(words)]
     return " ".join(sorted_words)
 
-def generate_comparison(prompt_text, context_abstracts):
-    genai.configure(api_key=GEMINI_API_KEY2)
-    model = genai.GenerativeModel("gemini-2.0-flash")
+def generate_comparison(prompt_text, context_abstracts, timeout=None):
     full_prompt = f"""
 You are a research originality evaluator.
 
@@ -48,6 +46,6 @@ Query Abstract:
 Similar Research Abstracts:
 {context_abstracts}
 """
-    response = model.generate_content(full_prompt)
-    match = re.search(r"\d{1,3}", response.text)
+    response_text = generate_text(GEMINI_API_KEY2, full_prompt, timeout=timeout)
+    match = re.search(r"\d{1,3}", response_text)
     return int(match.group()) if match else "Similarity not determined"